@@ -1,17 +1,41 @@
 import os
-import json
-import uuid
+import orjson
+import shutil
 import datetime
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, session, redirect, stream_with_context, url_for
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import sessionmaker
+from werkzeug.utils import secure_filename
 from research_assistant import ResearchAssistant, ResearchAssistantError
-from models import db, Folder, Document, Chat, Message
+from models import db, dumps_json, ensure_schema, get_uuid, Folder, Document, Chat, Message
 
 # Load environment variables from .env file
 load_dotenv()
 
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which also serializes datetimes natively."""
+    
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC),
+            mimetype="application/json"
+        )
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 # SECURITY WARNING: Hardcoded default secret key is insecure.
 # In production, SECRET_KEY MUST be set as a strong, random environment variable.
 # Consider raising an error if SECRET_KEY is not set in production environments.
@@ -22,11 +46,62 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev_key_for_testing") # Placeholder: Original insecure code left for now
 CORS(app)
 
+# Compress larger responses (chat histories, document lists) per Accept-Encoding
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_STREAMS'] = False  # Compressing would buffer server-sent events
+Compress(app)
+
+# Uploads are copied to disk in chunks of this size instead of being buffered whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+if os.environ.get("MAX_CONTENT_LENGTH"):
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ["MAX_CONTENT_LENGTH"])
+
 # Configure database
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///quetzal.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Size the connection pool for concurrent requests on server databases
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+# Optional read replica for the listing endpoints, e.g. a Postgres streaming replica
+READ_DATABASE_URL = os.environ.get('READ_DATABASE_URL')
+if READ_DATABASE_URL:
+    app.config['SQLALCHEMY_BINDS'] = {'read': READ_DATABASE_URL}
 db.init_app(app)
 
+read_session_factory = None
+if READ_DATABASE_URL:
+    with app.app_context():
+        read_session_factory = sessionmaker(bind=db.engines['read'])
+
+def read_query(model):
+    """
+    Query a model for a read-only endpoint.
+    
+    Uses a per-request session on the read replica when READ_DATABASE_URL is
+    set, so listings don't compete with ingestion writes for primary
+    connections. Falls back to the primary session otherwise.
+    """
+    if read_session_factory is None:
+        return model.query
+    if "read_session" not in g:
+        g.read_session = read_session_factory()
+    return g.read_session.query(model)
+
+@app.teardown_appcontext
+def close_read_session(exception=None):
+    """Release the read replica session at the end of a request."""
+    read_session = g.pop("read_session", None)
+    if read_session is not None:
+        read_session.close()
+
 # Initialize Research Assistant with API keys
 assistant = None
 initialization_error = None
@@ -35,24 +110,137 @@ try:
     assistant = ResearchAssistant(
         google_api_key=os.environ.get("GOOGLE_API_KEY"),
         weaviate_api_key=os.environ.get("WEAVIATE_API_KEY"),
-        weaviate_url=os.environ.get("WEAVIATE_URL")
+        weaviate_url=os.environ.get("WEAVIATE_URL"),
+        semantic_cache_threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.95)),
+        semantic_cache_ttl=float(os.environ.get("SEMANTIC_CACHE_TTL", 300))
     )
+    # Connect the clients every request needs now, so configuration errors are reported at startup
+    assistant.llm
+    assistant.vector_store
     print("Research Assistant initialized successfully.")
 except ResearchAssistantError as e:
+    assistant = None
     initialization_error = str(e)
     print(f"Error initializing Research Assistant: {initialization_error}")
 except Exception as e:
+    assistant = None
     initialization_error = str(e)
     print(f"Unexpected error initializing Research Assistant: {initialization_error}")
 
 # Create database tables
 with app.app_context():
     db.create_all()
+    ensure_schema()
     # Create default folder if it doesn't exist
-    if not Folder.query.filter_by(name="Default").first():
+    default_folder = Folder.query.filter_by(name="Default").first()
+    if not default_folder:
         default_folder = Folder(name="Default", description="Default folder for documents and chats")
         db.session.add(default_folder)
         db.session.commit()
+    # The default folder is never deleted, so its ID can be looked up once
+    app.config['DEFAULT_FOLDER_ID'] = default_folder.id
+
+# Background workers for document ingestion
+ingest_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("INGEST_WORKERS", 4)))
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", 200))
+
+def ingest_document(document_id, source, folder_id, temp_path=None):
+    """Process and store a document in the background, recording the outcome on its row."""
+    with app.app_context():
+        doc = Document.query.get(document_id)
+        try:
+            result = assistant.process_and_store_document(
+                temp_path or source,
+                folder_id=folder_id,
+                batch_size=INGEST_BATCH_SIZE,
+                source_name=source  # Uploads are keyed and titled by their original file name, not the temporary path
+            )
+            
+            if result["success"]:
+                doc.vector_id = result["document_ids"][0] if result["document_ids"] else None
+                if doc.document_type == "url":
+                    doc.title = result["title"]
+                doc.status = "ready"
+            else:
+                doc.status = "error"
+                doc.error = result.get("error")
+        except Exception as e:
+            doc.status = "error"
+            doc.error = str(e)
+        finally:
+            db.session.commit()
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+def json_list_response(key, rows, **extra):
+    """Build a success response listing rows from their cached JSON without re-encoding them."""
+    body = '{"success": true, "%s": [%s]' % (key, ",".join(row.to_json() for row in rows))
+    for name, value in extra.items():
+        body += ', "%s": %s' % (name, dumps_json(value))
+    return Response(body + "}", mimetype="application/json")
+
+# List endpoints return at most this many rows per request
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def parse_page_args(args):
+    """
+    Read keyset pagination parameters from a request.
+    
+    Returns:
+        Tuple of (limit, cursor) where cursor is a (naive UTC datetime, ID or None)
+        tuple, or None for the first page
+        
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    limit = min(max(int(args.get("limit") or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    before = args.get("before")
+    if not before:
+        return limit, None
+    before = datetime.datetime.fromisoformat(before)
+    if before.tzinfo is not None:
+        before = before.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return limit, (before, args.get("before_id") or None)
+
+def paginate(query, column, limit, cursor):
+    """
+    Fetch one page of a query, newest first, keyed on a timestamp column.
+    
+    Rows are ordered by (timestamp, ID), so rows sharing a timestamp (e.g.
+    moved together by one bulk update) are split across pages without any
+    being skipped.
+    
+    Returns:
+        Tuple of (rows, next_cursor) where next_cursor is the (timestamp, ID)
+        cursor for the following page, or None if this is the last page
+    """
+    id_column = column.class_.id
+    if cursor is not None:
+        before, before_id = cursor
+        if before_id is None:
+            # Timestamp-only cursor from an older client
+            query = query.filter(column < before)
+        else:
+            query = query.filter(or_(column < before, and_(column == before, id_column < before_id)))
+    rows = query.order_by(column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (getattr(rows[-1], column.key), rows[-1].id)
+
+def page_fields(next_cursor):
+    """Response fields telling the client whether and how to fetch the next page."""
+    if next_cursor is None:
+        return {"has_more": False, "next_before": None, "next_before_id": None}
+    return {"has_more": True, "next_before": next_cursor[0], "next_before_id": next_cursor[1]}
+
+def conditional_json_response(payload, cache_control):
+    """Build a JSON response with an ETag, answering 304 when the client's copy is current."""
+    response = jsonify(payload)
+    response.headers['Cache-Control'] = cache_control
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route("/")
 def index():
@@ -62,10 +250,11 @@ def index():
 @app.route("/status")
 def status():
     """Return the status of the Research Assistant initialization."""
-    return jsonify({
+    # Initialization state is fixed for the life of the process
+    return conditional_json_response({
         "assistant_initialized": assistant is not None,
         "error": initialization_error
-    })
+    }, 'private, max-age=60')
 
 @app.route("/process-url", methods=["POST"])
 def process_url():
@@ -84,25 +273,25 @@ def process_url():
         })
     
     try:
-        # Process the URL and store document
-        result = assistant.process_and_store_document(url, folder_id=folder_id)
-        
-        if result["success"]:
-            # Save document in database
-            doc = Document(
-                title=result["title"],
-                source=url,
-                vector_id=result["document_ids"][0] if result["document_ids"] else None,
-                folder_id=folder_id,
-                document_type="url"
-            )
-            db.session.add(doc)
-            db.session.commit()
-            
-            # Update result with database ID
-            result["document_id"] = doc.id
+        # Record the document and hand the ingestion off to a background worker
+        doc = Document(
+            title=url,
+            source=url,
+            folder_id=folder_id,
+            document_type="url",
+            status="pending"
+        )
+        db.session.add(doc)
+        db.session.commit()
         
-        return jsonify(result)
+        ingest_executor.submit(ingest_document, doc.id, url, folder_id)
+        
+        return jsonify({
+            "success": True,
+            "job_id": doc.id,
+            "document_id": doc.id,
+            "status": doc.status
+        })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
@@ -134,57 +323,108 @@ def upload_document():
             "error": f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
         })
     
+    # Sanitize the client-supplied name before it is stored as the document source
+    original_filename = secure_filename(file.filename) or f"upload.{file_ext}"
+    
+    temp_path = None
     try:
-        # SECURITY WARNING: Saving uploads with user-provided filenames without sanitization is risky (Path Traversal).
-        # Also, using a predictable temp directory can be insecure.
-        # RECOMMENDATION:
-        # 1. Sanitize the filename using `werkzeug.utils.secure_filename`.
-        # 2. Use the `tempfile` module for secure temporary file creation and management.
-        # Example (conceptual):
-        # import tempfile
-        # from werkzeug.utils import secure_filename
-        # original_filename = secure_filename(file.filename)
-        # if not original_filename: raise ValueError("Invalid filename")
-        # file_ext = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
-        # with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_ext}", dir="<secure_temp_dir>") as tmp_file:
-        #     file.save(tmp_file.name)
-        #     temp_path = tmp_file.name
-        #     # ... process temp_path ...
-        #     # Ensure cleanup in a finally block: if temp_path and os.path.exists(temp_path): os.remove(temp_path)
-
-        # Placeholder: Original insecure code left for now
-        # Save the file to disk temporarily
-        temp_path = f"temp_{uuid.uuid4()}.{file_ext}"
-        file.save(temp_path)
-        
-        # Process the file
-        result = assistant.process_and_store_document(temp_path, folder_id=folder_id)
-        
-        # Clean up the temporary file
-        os.remove(temp_path)
-        
-        if result["success"]:
-            # Save document in database
-            doc = Document(
-                title=result["title"],
-                source=file.filename,
-                vector_id=result["document_ids"][0] if result["document_ids"] else None,
-                folder_id=folder_id,
-                document_type="file"
-            )
-            db.session.add(doc)
-            db.session.commit()
-            
-            # Update result with database ID
-            result["document_id"] = doc.id
+        # Stream the upload to a temporary file in fixed-size chunks
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_ext}") as tmp_file:
+            shutil.copyfileobj(file.stream, tmp_file, length=UPLOAD_CHUNK_SIZE)
+            temp_path = tmp_file.name
+        
+        # Record the document and hand the ingestion off to a background worker,
+        # which also removes the temporary file
+        doc = Document(
+            title=os.path.splitext(original_filename)[0],
+            source=original_filename,
+            folder_id=folder_id,
+            document_type="file",
+            status="pending"
+        )
+        db.session.add(doc)
+        db.session.commit()
         
-        return jsonify(result)
+        ingest_executor.submit(ingest_document, doc.id, original_filename, folder_id, temp_path)
+        
+        return jsonify({
+            "success": True,
+            "job_id": doc.id,
+            "document_id": doc.id,
+            "status": doc.status
+        })
     except Exception as e:
-        # Clean up if there was an error
-        if os.path.exists(temp_path):
+        # Clean up if the job could not be queued
+        if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
         return jsonify({"success": False, "error": str(e)})
 
+@app.route("/job-status", methods=["GET"])
+def job_status():
+    """Get the ingestion status of a processed URL or uploaded document."""
+    job_id = request.args.get("job_id")
+    
+    if not job_id:
+        return jsonify({"success": False, "error": "No job ID provided"})
+    
+    try:
+        doc = Document.query.get(job_id)
+        if not doc:
+            return jsonify({"success": False, "error": "Job not found"})
+        
+        return jsonify({
+            "success": True,
+            "status": doc.status,
+            "error": doc.error,
+            "document": doc.to_dict()
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+def get_or_start_chat(chat_id, query_text, folder_id):
+    """
+    Get a chat by ID, or start a new one titled after the query.
+    
+    A new chat is only added to the session; it is written together with
+    its first messages by save_exchange.
+    
+    Returns:
+        The chat, or None if chat_id doesn't exist
+    """
+    if chat_id:
+        return Chat.query.get(chat_id)
+    
+    chat = Chat(
+        id=get_uuid(),
+        title=query_text[:30] + "..." if len(query_text) > 30 else query_text,
+        folder_id=folder_id
+    )
+    db.session.add(chat)
+    return chat
+
+def save_exchange(chat, query_text, asked_at, result):
+    """Save a question and its answer (and a new chat's row) in a single transaction."""
+    db.session.add_all([
+        Message(
+            chat_id=chat.id,
+            role="user",
+            content=query_text,
+            created_at=asked_at
+        ),
+        Message(
+            chat_id=chat.id,
+            role="assistant",
+            content=result["answer"],
+            sources=result.get("sources")
+        )
+    ])
+    
+    # Title a chat created from /new-chat after its first question
+    if chat.title == "New Chat":
+        chat.title = query_text[:30] + "..." if len(query_text) > 30 else query_text
+    
+    db.session.commit()
+
 @app.route("/query", methods=["POST"])
 def query():
     """Query the research assistant."""
@@ -204,57 +444,75 @@ def query():
         })
         
     try:
-        # Get chat or create a new one
-        if not chat_id:
-            chat = Chat(
-                title=query_text[:30] + "..." if len(query_text) > 30 else query_text,
-                folder_id=folder_id
-            )
-            db.session.add(chat)
-            db.session.commit()
-            chat_id = chat.id
-        else:
-            chat = Chat.query.get(chat_id)
-            if not chat:
-                return jsonify({"success": False, "error": "Invalid chat ID"})
+        # Get chat or create a new one; new rows are only written once the answer is ready
+        chat = get_or_start_chat(chat_id, query_text, folder_id)
+        if not chat:
+            return jsonify({"success": False, "error": "Invalid chat ID"})
         
-        # Save user message
-        user_message = Message(
-            chat_id=chat_id,
-            role="user",
-            content=query_text
-        )
-        db.session.add(user_message)
-        db.session.commit()
+        asked_at = datetime.datetime.utcnow()
         
-        # Get answer from the research assistant
+        # Get answer from the research assistant (served from its caches for repeated queries)
         result = assistant.answer_query(query_text, search_type=search_type, folder_id=folder_id)
+        cache_hit = result.get("cache_hit", False)
         
-        # Save assistant message
-        assistant_message = Message(
-            chat_id=chat_id,
-            role="assistant",
-            content=result["answer"],
-            sources=result.get("sources")
-        )
-        db.session.add(assistant_message)
-        
-        # Update chat title if it's the first message
-        message_count = Message.query.filter_by(chat_id=chat_id).count()
-        if message_count <= 2:  # User message + assistant response we just added
-            chat.title = query_text[:30] + "..." if len(query_text) > 30 else query_text
-        
-        db.session.commit()
+        save_exchange(chat, query_text, asked_at, result)
         
         return jsonify({
             "success": True,
             "answer": result["answer"],
             "sources": result.get("sources", []),
-            "chat_id": chat_id
+            "chat_id": chat.id,
+            "cache_hit": cache_hit
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route("/query-stream", methods=["POST"])
+def query_stream():
+    """
+    Query the research assistant, streaming the answer as server-sent events.
+    
+    Each event is a JSON object: "delta" events carry answer text as it is
+    generated, and a final "done" event carries the complete answer, sources
+    and chat ID (or an "error" event if answering failed).
+    """
+    data = request.json
+    query_text = data.get("query")
+    chat_id = data.get("chat_id")
+    folder_id = data.get("folder_id")
+    search_type = data.get("search_type", "hybrid")
+    
+    if not query_text:
+        return jsonify({"success": False, "error": "No query provided"})
+    
+    if assistant is None:
+        return jsonify({
+            "success": False, 
+            "error": f"Research Assistant not initialized. Error: {initialization_error}"
+        })
+    
+    chat = get_or_start_chat(chat_id, query_text, folder_id)
+    if not chat:
+        return jsonify({"success": False, "error": "Invalid chat ID"})
+    asked_at = datetime.datetime.utcnow()
+    
+    def generate():
+        try:
+            for event in assistant.stream_answer(query_text, search_type=search_type, folder_id=folder_id):
+                if event["type"] == "done":
+                    save_exchange(chat, query_text, asked_at, event)
+                    event = {**event, "chat_id": chat.id}
+                yield f"data: {dumps_json(event)}\n\n"
+        except Exception as e:
+            db.session.rollback()
+            yield f"data: {dumps_json({'type': 'error', 'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route("/new-chat", methods=["GET"])
 def new_chat():
     """Create a new chat."""
@@ -274,27 +532,25 @@ def new_chat():
 
 @app.route("/get-chats", methods=["GET"])
 def get_chats():
-    """Get list of all chats, optionally filtered by folder."""
+    """Get a page of chats (newest first), optionally filtered by folder."""
     folder_id = request.args.get("folder_id")
     
     try:
-        query = Chat.query.order_by(Chat.updated_at.desc())
+        limit, cursor = parse_page_args(request.args)
+        query = read_query(Chat)
         
         if folder_id:
             query = query.filter_by(folder_id=folder_id)
             
-        chats = query.all()
+        chats, next_cursor = paginate(query, Chat.updated_at, limit, cursor)
         
-        return jsonify({
-            "success": True,
-            "chats": [chat.to_dict() for chat in chats]
-        })
+        return json_list_response("chats", chats, **page_fields(next_cursor))
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
 @app.route("/get-chat-history", methods=["POST"])
 def get_chat_history():
-    """Get chat history for a specific chat."""
+    """Get a page of chat history for a specific chat, ending at the latest message."""
     data = request.json
     chat_id = data.get("chat_id")
     
@@ -302,12 +558,12 @@ def get_chat_history():
         return jsonify({"success": False, "error": "No chat ID provided"})
     
     try:
-        messages = Message.query.filter_by(chat_id=chat_id).order_by(Message.created_at).all()
+        # Latest messages first, then returned in chronological order
+        limit, cursor = parse_page_args(data)
+        messages, next_cursor = paginate(read_query(Message).filter_by(chat_id=chat_id), Message.created_at, limit, cursor)
+        messages.reverse()
         
-        return jsonify({
-            "success": True,
-            "history": [message.to_dict() for message in messages]
-        })
+        return json_list_response("history", messages, **page_fields(next_cursor))
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
@@ -359,12 +615,15 @@ def delete_chat():
 def get_folders():
     """Get list of all folders."""
     try:
-        # Only get top-level folders
-        folders = Folder.query.filter_by(parent_id=None).all()
+        # Load every folder in one query and assemble the tree in memory
+        children_by_parent = {}
+        for folder in read_query(Folder).all():
+            children_by_parent.setdefault(folder.parent_id, []).append(folder)
         
+        # Only return top-level folders; subfolders are nested as children
         return jsonify({
             "success": True,
-            "folders": [folder.to_dict() for folder in folders]
+            "folders": [folder.to_dict(children_by_parent) for folder in children_by_parent.get(None, [])]
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -439,17 +698,15 @@ def delete_folder():
             return jsonify({"success": False, "error": "Folder not found"})
         
         # Prevent deletion of default folder
-        if folder.name == "Default":
+        default_folder_id = app.config['DEFAULT_FOLDER_ID']
+        if folder.id == default_folder_id:
             return jsonify({"success": False, "error": "Cannot delete the default folder"})
         
-        # Move contents to default folder or handle as needed
-        default_folder = Folder.query.filter_by(name="Default").first()
-        
         # Move chats to default folder
-        Chat.query.filter_by(folder_id=folder_id).update({"folder_id": default_folder.id})
+        Chat.query.filter_by(folder_id=folder_id).update({"folder_id": default_folder_id, "cached_json": None})
         
         # Move documents to default folder
-        Document.query.filter_by(folder_id=folder_id).update({"folder_id": default_folder.id})
+        Document.query.filter_by(folder_id=folder_id).update({"folder_id": default_folder_id, "cached_json": None})
         
         # Delete folder and commit changes
         db.session.delete(folder)
@@ -461,21 +718,19 @@ def delete_folder():
 
 @app.route("/get-documents", methods=["GET"])
 def get_documents():
-    """Get list of documents, optionally filtered by folder."""
+    """Get a page of documents (newest first), optionally filtered by folder."""
     folder_id = request.args.get("folder_id")
     
     try:
-        query = Document.query.order_by(Document.updated_at.desc())
+        limit, cursor = parse_page_args(request.args)
+        query = read_query(Document)
         
         if folder_id:
             query = query.filter_by(folder_id=folder_id)
             
-        documents = query.all()
+        documents, next_cursor = paginate(query, Document.updated_at, limit, cursor)
         
-        return jsonify({
-            "success": True,
-            "documents": [doc.to_dict() for doc in documents]
-        })
+        return json_list_response("documents", documents, **page_fields(next_cursor))
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
@@ -537,10 +792,11 @@ def get_theme():
     """Get the user's theme preference."""
     theme = session.get("theme", "light")
     
-    return jsonify({
+    # Always revalidate since POST /theme can change it at any time
+    return conditional_json_response({
         "success": True,
         "theme": theme
-    })
+    }, 'private, no-cache')
 
 if __name__ == "__main__":
     # SECURITY WARNING: The Flask development server (`app.run`) is NOT suitable for production.
@@ -20,6 +20,9 @@ WEB_CRAWLER_CONFIG = {
     "retry_delay": 5,  # seconds
     "respect_robots_txt": True,
     "max_pages_per_site": 100,
+    # Worker processes parsing pages during depth crawls; 0 parses on the crawl's threads.
+    # Workers are spawned, so each re-imports the main module (e.g. the whole web app) on startup
+    "parse_workers": 0,
 }
 
 # Document processing settings
@@ -29,6 +32,18 @@ DOCUMENT_PROCESSOR_CONFIG = {
     "supported_file_types": [".txt", ".md", ".pdf"],
 }
 
+# Embedding settings
+EMBEDDING_CONFIG = {
+    "model": "all-MiniLM-L6-v2",  # Local SentenceTransformer model
+    "encode_batch_size": 128,  # Chunks per forward pass when embedding documents
+    "half_precision_on_gpu": True,  # Run the encoder in FP16 when it is placed on a GPU
+    "backend": "torch",  # Options: "torch", "onnx" (ONNX Runtime; needs the optional extra: pip install "sentence-transformers[onnx]")
+    "onnx_file_name": "onnx/model_qint8_avx512_vnni.onnx",  # int8-quantized graph used by the "onnx" backend; None for FP32
+    # Compression of new Weaviate collections' vector index. Options: None (uncompressed), "sq" (8-bit
+    # scalar, ~4x smaller), "pq", "bq" (1 bit per dimension; loses much recall on small models like MiniLM)
+    "vector_quantizer": None,
+}
+
 # LLM Integration settings
 LLM_CONFIG = {
     "provider": "mistral",
@@ -45,6 +60,11 @@ STORAGE_CONFIG = {
     "cache_enabled": True,
     "cache_type": "memory",  # Options: "memory", "redis"
     "cache_ttl": 3600,  # seconds
+    "document_cache_dir": os.path.join(DATA_DIR, "doccache"),  # Extracted document text
+    "document_cache_size_limit": 2 << 30,  # bytes
+    "document_cache_ttl": 86400,  # seconds
+    "answer_cache_dir": os.path.join(DATA_DIR, "answercache"),  # Cached answers, kept across restarts
+    "answer_cache_size_limit": 256 << 20,  # bytes
 }
 
 # Web server settings
@@ -0,0 +1,75 @@
+"""
+On-disk crawl results for the Quetzal Research Assistant.
+Keeps crawled pages in SQLite as they complete, so large crawls do not hold every page in memory.
+"""
+
+import os
+import sqlite3
+import time
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Tuple
+
+class CrawlStore(Mapping):
+    """
+    SQLite-backed mapping of crawled URLs to their extracted text, in crawl order.
+
+    Pages are written as they are crawled and read back on demand. Each
+    page's links are stored too, so a crawl can be resumed by replaying
+    stored pages instead of fetching them again.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a crawl store.
+
+        Args:
+            path: SQLite database file; pages already in it are kept
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # Autocommit, so each page is durable once written; the store may be read from another thread than the crawl's
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, content TEXT NOT NULL, links TEXT NOT NULL, crawled_at REAL NOT NULL)"
+        )
+
+    def add(self, url: str, content: str, links: List[str]):
+        """Store a crawled page, replacing an earlier copy but keeping its place in crawl order."""
+        self._db.execute(
+            "INSERT INTO pages (url, content, links, crawled_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET content = excluded.content, links = excluded.links, crawled_at = excluded.crawled_at",
+            (url, content, "\n".join(links), time.time())
+        )
+
+    def get_page(self, url: str) -> Optional[Tuple[str, List[str]]]:
+        """Get a stored page as (content, links), or None if it was not crawled."""
+        row = self._db.execute("SELECT content, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1].split("\n") if row[1] else []
+
+    def __getitem__(self, url: str) -> str:
+        row = self._db.execute("SELECT content FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return row[0]
+
+    def __iter__(self) -> Iterator[str]:
+        # Fetch URLs up front, so pages can be read (or added) while iterating
+        urls = [row[0] for row in self._db.execute("SELECT url FROM pages ORDER BY rowid")]
+        return iter(urls)
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def __contains__(self, url) -> bool:
+        return self._db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def close(self):
+        """Close the database connection."""
+        self._db.close()
@@ -0,0 +1,76 @@
+"""
+Embedding request batching for the Quetzal Research Assistant.
+Runs every encoder call on one worker thread, merging requests that arrive while it is busy.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+import numpy as np
+
+class EncodeBatcher:
+    """
+    Serializes calls to an encoder and coalesces concurrent ones.
+
+    Requests queue up while the worker is encoding and are then encoded
+    together in a single call, so concurrent ingestion and queries share
+    forward passes instead of competing for the CPU/GPU. A request arriving
+    while the worker is idle is encoded right away, without waiting for
+    others to join it.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch: int = 1024):
+        """
+        Start the worker thread.
+
+        Args:
+            encode: Function embedding a list of texts into a matrix, one row per text
+            max_batch: Maximum number of texts merged into one call (a single larger
+                request is still encoded whole)
+        """
+        self._encode = encode
+        self.max_batch = max_batch
+        self._requests = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._run, name="encoder", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding, returning a future for their embeddings matrix."""
+        future = Future()
+        self._requests.put((list(texts), future))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, blocking until their embeddings are ready."""
+        return self.submit(texts).result()
+
+    def _take_batch(self) -> list:
+        """Wait for a request, then add any others already queued, up to max_batch texts."""
+        batch = [self._requests.get()]
+        size = len(batch[0][0])
+        while size < self.max_batch:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(texts, future) for texts, future in self._take_batch() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                embeddings = self._encode([text for texts, _ in batch for text in texts])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for texts, future in batch:
+                future.set_result(embeddings[start:start + len(texts)])
+                start += len(texts)
@@ -1,6 +1,6 @@
 import os
 import google.generativeai as genai
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 class GoogleAPIError(Exception):
     """Custom exception for Google AI Studio API errors."""
@@ -22,21 +22,25 @@ class GoogleLLM:
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
         
+    def _build_prompt(self, content: str, prompt: Optional[str], system_prompt: Optional[str]) -> str:
+        """Combine the system prompt with the user prompt or content to analyze."""
+        # SECURITY WARNING: `prompt` and `content` (often containing user input or retrieved data)
+        # are directly concatenated into `full_prompt`. This is vulnerable to Prompt Injection.
+        # RECOMMENDATION: Use structured API calls if available (e.g., roles for system/user messages).
+        # Clearly delimit user input within the prompt. Consider input/output filtering.
+        if prompt:
+            return f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        elif content:
+            return f"{system_prompt}\n\nPlease analyze and summarize the following content: {content}" if system_prompt else f"Please analyze and summarize the following content: {content}"
+        else:
+            raise ValueError("Either prompt or content must be provided")
+        
     def process_content(self, content: str = "", prompt: Optional[str] = None,
                        system_prompt: Optional[str] = None, max_tokens: int = 2000) -> str:
         """Process content with the Gemini model."""
         try:
-            # SECURITY WARNING: `prompt` and `content` (often containing user input or retrieved data)
-            # are directly concatenated into `full_prompt`. This is vulnerable to Prompt Injection.
-            # RECOMMENDATION: Use structured API calls if available (e.g., roles for system/user messages).
-            # Clearly delimit user input within the prompt. Consider input/output filtering.
             # Prepare the prompt
-            if prompt:
-                full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-            elif content:
-                full_prompt = f"{system_prompt}\n\nPlease analyze and summarize the following content: {content}" if system_prompt else f"Please analyze and summarize the following content: {content}"
-            else:
-                raise ValueError("Either prompt or content must be provided")
+            full_prompt = self._build_prompt(content, prompt, system_prompt)
             
             # Generate response
             response = self.model.generate_content(full_prompt)
@@ -48,6 +52,27 @@ class GoogleLLM:
             # if this `GoogleAPIError` might be shown to users or less trusted logs.
             raise GoogleAPIError(f"Failed to process content: {str(e)}") # Placeholder: Original code left
             
+    async def aprocess_content(self, content: str = "", prompt: Optional[str] = None,
+                               system_prompt: Optional[str] = None, max_tokens: int = 2000) -> str:
+        """Process content with the Gemini model without blocking the event loop."""
+        try:
+            full_prompt = self._build_prompt(content, prompt, system_prompt)
+            response = await self.model.generate_content_async(full_prompt)
+            return response.text
+        except Exception as e:
+            raise GoogleAPIError(f"Failed to process content: {str(e)}")
+            
+    def stream_content(self, content: str = "", prompt: Optional[str] = None,
+                       system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Process content with the Gemini model, yielding the response text as it is generated."""
+        try:
+            full_prompt = self._build_prompt(content, prompt, system_prompt)
+            for chunk in self.model.generate_content(full_prompt, stream=True):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            raise GoogleAPIError(f"Failed to process content: {str(e)}")
+            
     def query(self, query: str, context: str) -> str:
         """Query the Gemini model with context."""
         prompt = f"Based on the following information:\n\n{context}\n\nPlease answer: {query}"
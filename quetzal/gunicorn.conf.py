@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for serving the Quetzal Research Assistant.
+
+Run from the quetzal directory with:
+    gunicorn -c gunicorn.conf.py app_web:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Each worker process loads its own embedding model and Weaviate client
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+
+# Threaded workers let concurrent /query requests overlap their LLM and
+# Weaviate waits while CPU-bound work (query embedding, background
+# ingestion) still runs on real threads. Set GUNICORN_WORKER_CLASS=gevent
+# to use greenlets instead; gunicorn monkey-patches the worker itself.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# LLM answers can take tens of seconds
+timeout = 120
+graceful_timeout = 30
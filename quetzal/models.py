@@ -1,14 +1,111 @@
 import os
+import time
+import sqlite3
 import uuid
 import datetime
+import orjson
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import object_session, relationship
 
 db = SQLAlchemy()
 
 def get_uuid():
-    """Generate a unique ID for records"""
-    return str(uuid.uuid4())
+    """Generate a unique, time-ordered ID for records (UUIDv7 layout)
+    
+    The millisecond timestamp prefix makes new rows append to the end of
+    primary key indexes instead of landing on random pages.
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (unix_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76                         # version
+        | (rand >> 68) << 64                # 12 random bits
+        | 0b10 << 62                        # RFC 4122 variant
+        | rand & ((1 << 62) - 1)            # 62 random bits
+    )
+    return str(uuid.UUID(int=value))
+
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use write-ahead logging on SQLite so reads don't block on the writer."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def dumps_json(obj):
+    """Serialize to a JSON string, writing naive datetimes as UTC ISO 8601 timestamps."""
+    return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC).decode()
+
+def ensure_schema():
+    """
+    Bring tables created by an older version of the models up to date.
+    
+    db.create_all() only creates missing tables, so existing databases get
+    missing columns added with ALTER TABLE and missing indexes created here.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT '{column.server_default.arg}'"
+            db.session.execute(text(ddl))
+    db.session.commit()
+    
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+class JSONCacheMixin:
+    """Keeps each row's to_dict() output serialized in a cached_json column.
+    
+    The JSON is refreshed whenever the row is inserted or updated through the
+    ORM, so list endpoints can emit stored strings instead of re-serializing
+    every row. Bulk query.update() calls bypass the hooks and must reset
+    cached_json to None.
+    """
+    cached_json = db.Column(db.Text, nullable=True)
+    
+    def to_json(self):
+        """Return the serialized row, falling back to to_dict() if no cache is stored."""
+        return self.cached_json or dumps_json(self.to_dict())
+
+@event.listens_for(JSONCacheMixin, "before_insert", propagate=True)
+def _cache_json_before_insert(mapper, connection, target):
+    # Column defaults are only applied during the INSERT itself, so fill them
+    # in now to have them in the cached JSON
+    for column in mapper.columns:
+        if column.default is None or getattr(target, column.key) is not None:
+            continue
+        if column.default.is_callable:
+            setattr(target, column.key, column.default.arg(None))
+        elif column.default.is_scalar:
+            setattr(target, column.key, column.default.arg)
+    target.cached_json = dumps_json(target.to_dict())
+
+@event.listens_for(JSONCacheMixin, "before_update", propagate=True)
+def _cache_json_before_update(mapper, connection, target):
+    # Apply onupdate values (e.g. updated_at) before serializing
+    if object_session(target).is_modified(target, include_collections=False):
+        for column in mapper.columns:
+            if column.onupdate is not None and column.onupdate.is_callable:
+                setattr(target, column.key, column.onupdate.arg(None))
+    target.cached_json = dumps_json(target.to_dict())
 
 class Folder(db.Model):
     """Folder model for organizing documents and chats"""
@@ -26,20 +123,29 @@ class Folder(db.Model):
     documents = relationship("Document", back_populates="folder")
     chats = relationship("Chat", back_populates="folder")
     
-    def to_dict(self):
+    def to_dict(self, children_by_parent=None):
+        """Serialize the folder and its subfolders.
+        
+        Pass a mapping of parent ID to child folders to build the tree from
+        already-loaded rows instead of lazy-loading each folder's children.
+        """
+        children = children_by_parent.get(self.id, []) if children_by_parent is not None else self.children
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "parent_id": self.parent_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "children": [child.to_dict() for child in self.children] if self.children else []
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "children": [child.to_dict(children_by_parent) for child in children] if children else []
         }
 
-class Document(db.Model):
+class Document(JSONCacheMixin, db.Model):
     """Document model for files and URLs processed by the assistant"""
     __tablename__ = "documents"
+    __table_args__ = (
+        db.Index("ix_documents_folder_updated", "folder_id", "updated_at"),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=get_uuid)
     title = db.Column(db.String(255), nullable=False)
@@ -47,6 +153,8 @@ class Document(db.Model):
     vector_id = db.Column(db.String(36), nullable=True)  # ID in the vector store
     folder_id = db.Column(db.String(36), db.ForeignKey('folders.id'), nullable=True)
     document_type = db.Column(db.String(20), nullable=False)  # 'file', 'url', etc.
+    status = db.Column(db.String(20), nullable=False, default="ready", server_default="ready")  # 'pending', 'ready' or 'error'
+    error = db.Column(db.Text, nullable=True)  # Ingestion error, if any
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
@@ -61,13 +169,18 @@ class Document(db.Model):
             "vector_id": self.vector_id,
             "folder_id": self.folder_id,
             "document_type": self.document_type,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
 
-class Chat(db.Model):
+class Chat(JSONCacheMixin, db.Model):
     """Chat model for conversations with the assistant"""
     __tablename__ = "chats"
+    __table_args__ = (
+        db.Index("ix_chats_folder_updated", "folder_id", "updated_at"),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=get_uuid)
     title = db.Column(db.String(255), nullable=False, default="New Chat")
@@ -84,13 +197,16 @@ class Chat(db.Model):
             "id": self.id,
             "title": self.title,
             "folder_id": self.folder_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
 
-class Message(db.Model):
+class Message(JSONCacheMixin, db.Model):
     """Message model for individual messages in a chat"""
     __tablename__ = "messages"
+    __table_args__ = (
+        db.Index("ix_messages_chat_created", "chat_id", "created_at"),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=get_uuid)
     chat_id = db.Column(db.String(36), db.ForeignKey('chats.id'), nullable=False)
@@ -109,5 +225,5 @@ class Message(db.Model):
             "role": self.role,
             "content": self.content,
             "sources": self.sources,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at
         } 
\ No newline at end of file
@@ -1,61 +1,242 @@
 import os
+import asyncio
+import re
+import copy
+import contextlib
 import glob
-from typing import Dict, Any, List, Optional
-from simple_doc_processor import SimpleDocProcessor
+import time
+import uuid
+import hashlib
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import diskcache
+from simple_doc_processor import SimpleDocProcessor, REQUEST_TIMEOUT
 from simple_crawler import SimpleCrawler
 from google_llm import GoogleLLM, GoogleAPIError
 from vector_store import VectorStore, WeaviateError
-from urllib.parse import urlparse
+from semantic_cache import SemanticCache
+from simhash import SimHash, hamming_distance
+from config.config import STORAGE_CONFIG
+from urllib.parse import urlparse, ParseResult
 
 class ResearchAssistantError(Exception):
     """Custom exception for Research Assistant errors."""
     pass
 
+# Question and filler words dropped when expanding queries
+_EXPANSION_STOPWORDS = frozenset({
+    "what", "when", "where", "who", "how", "why", "is", "are", "the", "a", "an",
+    "of", "in", "on", "and", "or", "to", "from", "with"
+})
+
+# Words of three or more characters
+_KEYWORD_RE = re.compile(r"\w{3,}")
+
+# Phrases indicating that a generated answer lacks information, matched in one pass
+_LACK_INFO_RE = re.compile(
+    r"don't have enough information"
+    r"|insufficient information"
+    r"|not enough context"
+    r"|cannot answer"
+    r"|unable to answer"
+    r"|not provided in the documents"
+    r"|isn't mentioned in the documents",
+    re.IGNORECASE
+)
+
+# Characters of streamed answer text kept to match phrases split across chunks
+_LACK_INFO_WINDOW = 200
+
+# Fixed instructions for answer generation (kept constant so they are built once)
+_SYSTEM_PROMPT = """You are a research assistant that provides accurate,
+            factual answers based solely on the provided documents.
+            Always attribute information to the specific document numbers [Document X] in your answer.
+            If the provided documents don't contain relevant information to answer the question,
+            say 'I don't have enough information to answer this question completely.'
+            Your response should be comprehensive, well-organized, and directly address the query."""
+
+_USER_PROMPT_TEMPLATE = """Question: {query}
+            
+            Context from documents:
+            {context}
+            
+            Answer the question using only information from these documents.
+            Cite document numbers using [Document X] format."""
+
+@functools.lru_cache(maxsize=8192)
+def _classify_source(file_path_or_url: str) -> Optional[ParseResult]:
+    """Parse a document source once; returns the parsed URL, or None for file paths."""
+    if file_path_or_url.startswith(('http://', 'https://')):
+        return urlparse(file_path_or_url)
+    return None
+
+@functools.lru_cache(maxsize=8192)
+def _source_parts(file_path_or_url: str) -> Tuple[str, str]:
+    """Split a document source into (host, last path segment); the host is empty for file paths."""
+    parsed_url = _classify_source(file_path_or_url)
+    if not parsed_url:
+        return "", os.path.basename(file_path_or_url)
+    # Use the last segment, or the one before a trailing slash
+    path = parsed_url.path
+    return parsed_url.netloc, path.rsplit('/', 1)[-1] or path[:-1].rsplit('/', 1)[-1]
+
+@functools.lru_cache(maxsize=4096)
+def _expand_query_text(query: str) -> str:
+    """Append the query's keywords to it (pure, so results are memoized)."""
+    keywords = [word for word in _KEYWORD_RE.findall(query.lower()) if word not in _EXPANSION_STOPWORDS]
+    return f"{query} {' '.join(keywords)}"
+
 class ResearchAssistant:
     """Smart Research Assistant with RAG capabilities."""
     
+    # Bounds for the exact-match answer cache
+    ANSWER_CACHE_SIZE = 1000
+    ANSWER_CACHE_TTL = 300  # seconds
+    
+    # Shared answer store key whose value changes whenever any process clears the cached answers
+    ANSWER_GENERATION_KEY = "generation"
+    
+    # Concurrent fetches allowed against a single host when processing documents in parallel
+    MAX_REQUESTS_PER_DOMAIN = 2
+    
+    # Maximum SimHash bit difference for a re-ingested document to keep its stored chunks
+    SIMHASH_MAX_DISTANCE = 3
+    
     def __init__(self, google_api_key: Optional[str] = None, 
                  weaviate_api_key: Optional[str] = None, 
-                 weaviate_url: Optional[str] = None):
+                 weaviate_url: Optional[str] = None,
+                 semantic_cache_threshold: float = 0.95,
+                 semantic_cache_ttl: float = ANSWER_CACHE_TTL,
+                 semantic_cache_size: int = 10000,
+                 max_workers: int = 8):
         """
         Initialize the Research Assistant.
         
+        The LLM client, vector store, crawler and document processor are
+        created on first use, so callers only pay for the ones they need.
+        
         Args:
             google_api_key: Google AI Studio API key
             weaviate_api_key: Weaviate API key
             weaviate_url: Weaviate Cloud URL
+            semantic_cache_threshold: Minimum query-to-query cosine similarity to reuse an answer
+            semantic_cache_ttl: Time-to-live of semantically cached answers (in seconds)
+            semantic_cache_size: Maximum number of semantically cached answers per search scope
+            max_workers: Number of documents processed concurrently by process_multiple_documents
             
         Raises:
             ResearchAssistantError: If initialization fails
         """
+        # Answers keyed by query and search parameters, in LRU order
+        self._answer_cache = OrderedDict()
+        self._answer_cache_lock = threading.Lock()
+        self._answer_generation = None  # Last generation seen in the shared answer store
+        
+        # Per-host limits for parallel document processing
+        self._max_workers = max_workers
+        self._domain_semaphores = defaultdict(lambda: threading.Semaphore(self.MAX_REQUESTS_PER_DOMAIN))
+        self._domain_semaphores_lock = threading.Lock()
+        
+        # Answers for paraphrased queries, matched by query embedding
+        self._semantic_cache = SemanticCache(
+            threshold=semantic_cache_threshold,
+            ttl=semantic_cache_ttl,
+            max_entries=semantic_cache_size
+        )
+        
+        # Credentials for the clients below, which connect on first use
+        self._google_api_key = google_api_key or os.environ.get("GOOGLE_API_KEY")
+        self._weaviate_api_key = weaviate_api_key or os.environ.get("WEAVIATE_API_KEY")
+        self._weaviate_url = weaviate_url or os.environ.get("WEAVIATE_URL")
+        self._components = {}
+        self._components_lock = threading.Lock()
+        
         try:
-            self.doc_processor = SimpleDocProcessor()
-            self.crawler = SimpleCrawler(
-                respect_robots_txt=True,
-                crawl_delay=1.0,
-                max_pages=100,
-                max_depth=3
+            # Extracted text and stored chunk IDs of previously processed documents, keyed by content hash or URL validator
+            # SECURITY NOTE: The cache directory holds document text; restrict its filesystem permissions.
+            self._doc_cache = diskcache.Cache(
+                STORAGE_CONFIG["document_cache_dir"],
+                size_limit=STORAGE_CONFIG["document_cache_size_limit"]
             )
             
-            # Initialize Google LLM
-            self.llm = GoogleLLM(api_key=google_api_key or os.environ.get("GOOGLE_API_KEY"))
-            
-            # Initialize Vector Store
-            self.vector_store = VectorStore(
-                api_key=weaviate_api_key or os.environ.get("WEAVIATE_API_KEY"),
-                cloud_url=weaviate_url or os.environ.get("WEAVIATE_URL")
+            # Exact and semantic cache entries persisted so answers survive restarts
+            self._answer_store = diskcache.Cache(
+                STORAGE_CONFIG["answer_cache_dir"],
+                size_limit=STORAGE_CONFIG["answer_cache_size_limit"],
+                eviction_policy="least-recently-used"
             )
-        except GoogleAPIError as e:
-            raise ResearchAssistantError(f"Failed to initialize Google LLM: {str(e)}")
-        except WeaviateError as e:
-            raise ResearchAssistantError(f"Failed to initialize Vector Store: {str(e)}")
+            self._answer_generation = self._answer_store.get(self.ANSWER_GENERATION_KEY)
+            self._restore_semantic_cache()
         except Exception as e:
             raise ResearchAssistantError(f"Failed to initialize Research Assistant: {str(e)}")
     
+    def _component(self, name: str, factory):
+        """
+        Get a subcomponent, creating it on first use.
+        
+        Args:
+            name: Component name, used as the cache key
+            factory: Callable creating the component
+            
+        Raises:
+            ResearchAssistantError: If the component cannot be created (creation is retried on next use)
+        """
+        component = self._components.get(name)
+        if component is not None:
+            return component
+        
+        with self._components_lock:
+            component = self._components.get(name)
+            if component is None:
+                try:
+                    component = factory()
+                except GoogleAPIError as e:
+                    raise ResearchAssistantError(f"Failed to initialize Google LLM: {str(e)}")
+                except WeaviateError as e:
+                    raise ResearchAssistantError(f"Failed to initialize Vector Store: {str(e)}")
+                except Exception as e:
+                    raise ResearchAssistantError(f"Failed to initialize Research Assistant: {str(e)}")
+                self._components[name] = component
+            return component
+    
+    @property
+    def doc_processor(self) -> SimpleDocProcessor:
+        """Document text extractor."""
+        return self._component("doc_processor", SimpleDocProcessor)
+    
+    @property
+    def crawler(self) -> SimpleCrawler:
+        """Web crawler."""
+        return self._component("crawler", lambda: SimpleCrawler(
+            respect_robots_txt=True,
+            crawl_delay=1.0,
+            max_pages=100,
+            max_depth=3
+        ))
+    
+    @property
+    def llm(self) -> GoogleLLM:
+        """Google LLM client."""
+        return self._component("llm", lambda: GoogleLLM(api_key=self._google_api_key))
+    
+    @property
+    def vector_store(self) -> VectorStore:
+        """Weaviate vector store."""
+        return self._component("vector_store", lambda: VectorStore(
+            api_key=self._weaviate_api_key,
+            cloud_url=self._weaviate_url
+        ))
+    
     def process_document(self, file_path_or_url: str) -> Optional[str]:
         """
         Process a single document from file or URL.
         
+        Extracted text is cached on disk, keyed by the file's content hash or
+        the URL's ETag/Last-Modified, so unchanged sources are not re-parsed.
+        
         Args:
             file_path_or_url: Path to file or URL to process
             
@@ -71,39 +252,117 @@ class ResearchAssistant:
             # validated *before* calling this method to prevent LFI (for file paths) and SSRF (for URLs).
             # The validation should happen in the calling code (e.g., app_web.py).
             print(f"Processing: {file_path_or_url}")
+            return self._process_document(file_path_or_url, self._document_cache_key(file_path_or_url))
+        except ResearchAssistantError:
+            raise
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing document: {str(e)}")
+    
+    def _process_document(self, file_path_or_url: str, cache_key: Optional[str]) -> Optional[str]:
+        """Extract a document's text, reusing the text cached under cache_key (see _document_cache_key)."""
+        try:
+            if cache_key:
+                content = self._doc_cache.get(cache_key)
+                if content:
+                    print(f"Using cached content for: {file_path_or_url}")
+                    return content
             
             # Extract content based on source type
-            if file_path_or_url.startswith(('http://', 'https://')):
+            if _classify_source(file_path_or_url):
                 # SECURITY NOTE: Relies on `SimpleDocProcessor.process_url` for fetching and processing.
                 # Ensure `SimpleDocProcessor.process_url` implements SSRF protection.
                 content = self.doc_processor.process_url(file_path_or_url)
             else:
                 # SECURITY NOTE: Relies on `SimpleDocProcessor` file methods for processing.
                 # Ensure `SimpleDocProcessor` methods implement LFI protection (or path confinement).
-                if file_path_or_url.endswith('.pdf'):
-                    content = self.doc_processor.process_pdf_file(file_path_or_url)
-                elif file_path_or_url.endswith('.md'):
-                    content = self.doc_processor.process_markdown_file(file_path_or_url)
-                elif file_path_or_url.endswith('.txt'):
-                    content = self.doc_processor.process_text_file(file_path_or_url)
-                else:
+                handler = SimpleDocProcessor.EXTENSION_HANDLERS.get(os.path.splitext(file_path_or_url)[1].lower())
+                if handler is None:
                     raise ResearchAssistantError(f"Unsupported file type: {file_path_or_url}")
+                content = getattr(self.doc_processor, handler)(file_path_or_url)
             
             if not content:
                 raise ResearchAssistantError(f"Failed to extract content from: {file_path_or_url}")
             
+            if cache_key:
+                self._doc_cache.set(cache_key, content, expire=STORAGE_CONFIG["document_cache_ttl"])
+            
             return content
         except Exception as e:
             raise ResearchAssistantError(f"Error processing document: {str(e)}")
     
-    def process_and_store_document(self, file_path_or_url: str, document_id: Optional[str] = None, folder_id: Optional[str] = None) -> Dict[str, Any]:
+    def _document_cache_key(self, file_path_or_url: str) -> Optional[str]:
+        """
+        Build the extracted-text cache key for a document.
+        
+        Files are keyed by a SHA-256 of their bytes (plus extension, which
+        selects the parser). URLs are keyed by their ETag or Last-Modified
+        header from a HEAD request.
+        
+        Returns:
+            Cache key, or None if the source can't be identified cheaply
+        """
+        try:
+            if _classify_source(file_path_or_url):
+                # SECURITY NOTE: Same SSRF considerations as the GET in `SimpleDocProcessor.process_url`.
+                response = self.doc_processor.session.head(file_path_or_url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+                validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                if response.status_code != 200 or not validator:
+                    return None
+                return "url:" + hashlib.sha256(f"{file_path_or_url}|{validator}".encode()).hexdigest()
+            
+            digest = hashlib.sha256()
+            with open(file_path_or_url, "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(block)
+            return f"file:{os.path.splitext(file_path_or_url)[1].lower()}:{digest.hexdigest()}"
+        except Exception:
+            # Caching is best effort; fall back to processing the document
+            return None
+    
+    @staticmethod
+    def _ingest_key(content_key: Optional[str], source: str, title: str, document_id: Optional[str], folder_id: Optional[str]) -> Optional[str]:
+        """
+        Build the key under which a stored document's chunk IDs are remembered.
+        
+        Combines the document's content fingerprint (see _document_cache_key)
+        with the metadata stored on its chunks, so a hit means identical
+        chunks are already in the vector store.
+        
+        Returns:
+            Cache key, or None if the content can't be fingerprinted
+        """
+        if not content_key:
+            return None
+        metadata = f"{content_key}|{source}|{title}|{document_id}|{folder_id}"
+        return "ingested:" + hashlib.sha256(metadata.encode()).hexdigest()
+    
+    @staticmethod
+    def _version_key(source: str, title: str, document_id: Optional[str], folder_id: Optional[str]) -> str:
+        """
+        Build the key under which the fingerprint and chunk IDs of a source's last stored version are kept.
+        
+        Built from the document's stable identity (its URL or original file
+        name, document ID and folder), never a temporary upload path, so a
+        re-uploaded file finds its previous version.
+        """
+        metadata = f"{source}|{title}|{document_id}|{folder_id}"
+        return "version:" + hashlib.sha256(metadata.encode()).hexdigest()
+    
+    def process_and_store_document(self, file_path_or_url: str, document_id: Optional[str] = None, folder_id: Optional[str] = None, batch_size: int = 200, source_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a document and store it in the vector database.
         
+        Documents already stored with the same metadata are not embedded
+        again if their content is unchanged, or if their SimHash is within
+        SIMHASH_MAX_DISTANCE bits of the stored version's (small edits).
+        
         Args:
             file_path_or_url: Path to file or URL to process
             document_id: Optional external document ID for reference
             folder_id: Optional folder ID for organization
+            batch_size: Number of chunks sent to the vector store per insert request
+            source_name: Source recorded for the document and its title (e.g. the original
+                name of an uploaded file saved under a temporary path); file_path_or_url if not provided
             
         Returns:
             Dictionary containing processing results
@@ -112,33 +371,104 @@ class ResearchAssistant:
             ResearchAssistantError: If processing or storage fails
         """
         try:
-            # Process the document
-            content = self.process_document(file_path_or_url)
-            if not content:
-                return {"success": False, "error": "Failed to extract content"}
+            source = source_name or file_path_or_url
+            title = self._title_from_source(source)
+            
+            # Fingerprint the content once: a file hash, or for URLs one HEAD request
+            content_key = self._document_cache_key(file_path_or_url)
+            
+            # Skip re-embedding a document whose unchanged content is already stored with the same metadata
+            ingest_key = self._ingest_key(content_key, source, title, document_id, folder_id)
+            stored = self._doc_cache.get(ingest_key) if ingest_key else None
+            if stored:
+                print(f"Already stored, skipping: {file_path_or_url}")
+                return {
+                    "success": True,
+                    "document_ids": stored["document_ids"],
+                    "title": title,
+                    "characters_processed": stored["characters"],
+                    "document_id": document_id,
+                    "folder_id": folder_id,
+                    "cached": True
+                }
             
-            # Extract title
-            if file_path_or_url.startswith(('http://', 'https://')):
-                parts = file_path_or_url.split('/')
-                title = parts[-1] if parts[-1] else parts[-2]
+            # A re-ingested source whose text barely changed keeps its stored chunks
+            version_key = self._version_key(source, title, document_id, folder_id)
+            previous = self._doc_cache.get(version_key)
+            fingerprint = SimHash()
+            
+            if _classify_source(file_path_or_url) and not previous:
+                # Stream the page so chunks are embedded while the rest downloads
+                # SECURITY NOTE: Same SSRF considerations as `process_document`.
+                characters = 0
+                
+                def counted(pieces):
+                    nonlocal characters
+                    for piece in pieces:
+                        characters += len(piece)
+                        fingerprint.update(piece)
+                        yield piece
+                
+                doc_ids = self.vector_store.add_document_stream(
+                    counted(self.doc_processor.iter_url_text(file_path_or_url)),
+                    source=source,
+                    title=title,
+                    document_id=document_id,
+                    folder_id=folder_id,
+                    batch_size=batch_size
+                )
+                if not characters:
+                    return {"success": False, "error": "Failed to extract content"}
             else:
-                filename = os.path.basename(file_path_or_url)
-                title = os.path.splitext(filename)[0]
+                # Process the document
+                content = self._process_document(file_path_or_url, content_key)
+                if not content:
+                    return {"success": False, "error": "Failed to extract content"}
+                characters = len(content)
+                fingerprint.update(content)
+                
+                if previous and hamming_distance(fingerprint.digest(), previous["simhash"]) <= self.SIMHASH_MAX_DISTANCE:
+                    print(f"Nearly unchanged since last stored, skipping: {file_path_or_url}")
+                    return {
+                        "success": True,
+                        "document_ids": previous["document_ids"],
+                        "title": title,
+                        "characters_processed": characters,
+                        "document_id": document_id,
+                        "folder_id": folder_id,
+                        "fuzzy_cached": True
+                    }
+                
+                # Store in vector database
+                doc_ids = self.vector_store.add_document(
+                    content=content,
+                    source=source,
+                    title=title,
+                    document_id=document_id,
+                    folder_id=folder_id,
+                    batch_size=batch_size
+                )
             
-            # Store in vector database
-            doc_ids = self.vector_store.add_document(
-                content=content,
-                source=file_path_or_url,
-                title=title,
-                document_id=document_id,
-                folder_id=folder_id
+            if ingest_key:
+                self._doc_cache.set(
+                    ingest_key,
+                    {"document_ids": doc_ids, "characters": characters},
+                    expire=STORAGE_CONFIG["document_cache_ttl"]
+                )
+            self._doc_cache.set(
+                version_key,
+                {"simhash": fingerprint.digest(), "document_ids": doc_ids},
+                expire=STORAGE_CONFIG["document_cache_ttl"]
             )
             
+            # Cached answers may no longer reflect the document set
+            self.clear_answer_cache()
+            
             return {
                 "success": True,
                 "document_ids": doc_ids,
                 "title": title,
-                "characters_processed": len(content),
+                "characters_processed": characters,
                 "document_id": document_id,
                 "folder_id": folder_id
             }
@@ -153,29 +483,198 @@ class ResearchAssistant:
                 "error": str(e)
             }
     
+    async def aprocess_and_store_document(self, file_path_or_url: str, document_id: Optional[str] = None, folder_id: Optional[str] = None, batch_size: int = 200, source_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process and store a document like process_and_store_document, without blocking the event loop.
+        
+        The download, extraction, embedding and inserts run on a worker thread
+        (the event loop's default executor).
+        
+        Returns:
+            Dictionary containing processing results
+        """
+        return await asyncio.to_thread(
+            self.process_and_store_document,
+            file_path_or_url,
+            document_id=document_id,
+            folder_id=folder_id,
+            batch_size=batch_size,
+            source_name=source_name
+        )
+    
     def process_multiple_documents(self, file_paths_or_urls: List[str], document_ids: Optional[List[str]] = None, folder_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Process multiple documents and store them in the vector database.
         
+        Content is extracted concurrently on up to max_workers threads, with
+        at most MAX_REQUESTS_PER_DOMAIN in flight per URL host. The extracted
+        documents are then stored with one batched vector store call.
+        
         Args:
             file_paths_or_urls: List of file paths or URLs to process
             document_ids: Optional list of document IDs
             folder_id: Optional folder ID for organization
             
         Returns:
-            List of processing results for each document
+            List of processing results for each document, in input order
         """
-        results = []
-        for i, path_or_url in enumerate(file_paths_or_urls):
-            doc_id = document_ids[i] if document_ids and i < len(document_ids) else None
-            result = self.process_and_store_document(path_or_url, doc_id, folder_id)
-            results.append({"source": path_or_url, **result})
+        def extract(path_or_url):
+            with self._request_limit(path_or_url):
+                return self.process_document(path_or_url)
+        
+        results = [None] * len(file_paths_or_urls)
+        documents = []
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(extract, path_or_url) for path_or_url in file_paths_or_urls]
+            for i, (path_or_url, future) in enumerate(zip(file_paths_or_urls, futures)):
+                try:
+                    content = future.result()
+                except Exception as e:
+                    results[i] = {"source": path_or_url, "success": False, "error": str(e)}
+                    continue
+                
+                documents.append({
+                    "index": i,
+                    "content": content,
+                    "source": path_or_url,
+                    "title": self._title_from_source(path_or_url),
+                    "document_id": document_ids[i] if document_ids and i < len(document_ids) else None,
+                    "folder_id": folder_id
+                })
+        
+        if not documents:
+            return results
+        
+        try:
+            doc_ids = self.vector_store.add_documents_batch(documents)
+        except WeaviateError as e:
+            for document in documents:
+                results[document["index"]] = {
+                    "source": document["source"],
+                    "success": False,
+                    "error": f"Failed to store document: {str(e)}"
+                }
+            return results
+        
+        # Cached answers may no longer reflect the document set
+        self.clear_answer_cache()
+        
+        for document, ids in zip(documents, doc_ids):
+            results[document["index"]] = {
+                "source": document["source"],
+                "success": True,
+                "document_ids": ids,
+                "title": document["title"],
+                "characters_processed": len(document["content"]),
+                "document_id": document["document_id"],
+                "folder_id": folder_id
+            }
         return results
     
+    def crawl_and_store_website(self, start_url: str, max_depth: Optional[int] = None, max_pages: Optional[int] = None, url_patterns: Optional[List[str]] = None, folder_id: Optional[str] = None, pages_per_batch: int = 50) -> Dict[str, Any]:
+        """
+        Crawl a website and store every crawled page in the vector database.
+        
+        Pages are stored pages_per_batch at a time with one batched vector
+        store call each, so their chunks share embedding calls and insert
+        requests instead of costing a round trip per page. Batches are
+        stored on a background thread as soon as they fill up, so embedding
+        and inserting overlap the rest of the crawl.
+        
+        Args:
+            start_url: URL to start crawling from
+            max_depth: Maximum link depth (the crawler's default if not provided)
+            max_pages: Maximum number of pages (the crawler's default if not provided)
+            url_patterns: Optional regex patterns links must match to be followed
+            folder_id: Optional folder ID for organization
+            pages_per_batch: Number of pages stored per vector store call
+            
+        Returns:
+            Dictionary with the chunk IDs of each stored page and the errors of
+            pages that could not be stored
+        """
+        document_ids = {}
+        errors = {}
+        batch = []
+        
+        def store(batch):
+            try:
+                for document, ids in zip(batch, self.vector_store.add_documents_batch(batch)):
+                    document_ids[document["source"]] = ids
+            except Exception as e:
+                # Any failure (not only WeaviateError) must be recorded here: the submitted future is never awaited
+                for document in batch:
+                    errors[document["source"]] = f"Failed to store document: {str(e)}"
+        
+        # One storing thread, so batches are stored in order while the crawler fetches the next pages
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="store") as executor:
+            def on_page(url, content):
+                nonlocal batch
+                batch.append({
+                    "content": content,
+                    "source": url,
+                    "title": self._title_from_source(url),
+                    "folder_id": folder_id
+                })
+                if len(batch) >= pages_per_batch:
+                    executor.submit(store, batch)
+                    batch = []
+            
+            try:
+                pages = self.crawler.crawl_with_depth(start_url, max_depth, max_pages, url_patterns, on_page=on_page)
+            except Exception as e:
+                # Batches already submitted are still stored before returning
+                return {"success": False, "error": f"Failed to crawl {start_url}: {str(e)}"}
+            if batch:
+                executor.submit(store, batch)
+        
+        if document_ids:
+            # Cached answers may no longer reflect the document set
+            self.clear_answer_cache()
+        
+        return {
+            "success": bool(document_ids) or not errors,
+            "pages_crawled": len(pages),
+            "document_ids": document_ids,
+            "errors": errors,
+            "folder_id": folder_id
+        }
+    
+    def _title_from_source(self, file_path_or_url: str) -> str:
+        """Derive a document title from the last URL path segment (or host) or the file name."""
+        host, name = _source_parts(file_path_or_url)
+        if host:
+            return name or host
+        return os.path.splitext(name)[0]
+    
+    def _request_limit(self, file_path_or_url: str):
+        """Get a context manager limiting concurrent requests to a URL's host (no limit for files)."""
+        parsed_url = _classify_source(file_path_or_url)
+        if not parsed_url:
+            return contextlib.nullcontext()
+        with self._domain_semaphores_lock:
+            return self._domain_semaphores[parsed_url.netloc]
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the same model used for document retrieval.
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            Query embedding
+        """
+        return self.vector_store.embed_query(query)
+    
     def answer_query(self, query: str, search_type: str = "hybrid", context_limit: int = 5, folder_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Answer a query using RAG with enhanced retrieval.
         
+        Identical queries with the same parameters are answered from an
+        in-memory LRU cache for ANSWER_CACHE_TTL seconds. Near-duplicate
+        queries (by embedding similarity) are answered from a semantic cache.
+        
         Args:
             query: User's question
             search_type: Type of search to use (vector, keyword, hybrid)
@@ -183,11 +682,258 @@ class ResearchAssistant:
             folder_id: Optional folder ID to constrain the search
             
         Returns:
-            Dictionary containing answer and sources
+            Dictionary containing answer, sources and whether it was served
+            from a cache (cache_hit)
             
         Raises:
             ResearchAssistantError: If query processing fails
         """
+        cache_key = hashlib.sha256(f"{query}|{search_type}|{context_limit}|{folder_id}".encode()).hexdigest()
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return {**cached, "cache_hit": True}
+        
+        try:
+            query_embedding = self.embed_query(query)
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        semantic_scope = (search_type, context_limit, folder_id)
+        cached = self._semantic_cache.lookup(query_embedding, semantic_scope)
+        if cached is not None:
+            self._cache_answer(cache_key, cached)
+            return {**copy.deepcopy(cached), "cache_hit": True}
+        
+        result = self._answer_query(query, search_type, context_limit, folder_id)
+        return self._store_answer(cache_key, query_embedding, semantic_scope, result)
+    
+    async def aanswer_query(self, query: str, search_type: str = "hybrid", context_limit: int = 5, folder_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answer a query like answer_query, without blocking the event loop.
+        
+        The query embedding (for the semantic cache) and the vector search run
+        concurrently, and the answer is generated with the async Gemini API.
+        On a semantic cache hit the search result is discarded.
+        
+        Args:
+            query: User's question
+            search_type: Type of search to use (vector, keyword, hybrid)
+            context_limit: Maximum number of relevant documents to use
+            folder_id: Optional folder ID to constrain the search
+            
+        Returns:
+            Dictionary containing answer, sources and whether it was served
+            from a cache (cache_hit)
+            
+        Raises:
+            ResearchAssistantError: If query processing fails
+        """
+        cache_key = hashlib.sha256(f"{query}|{search_type}|{context_limit}|{folder_id}".encode()).hexdigest()
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return {**cached, "cache_hit": True}
+        
+        try:
+            print(f"Searching for documents relevant to query using {search_type} search")
+            query_embedding, relevant_docs = await asyncio.gather(
+                asyncio.to_thread(self.embed_query, query),
+                asyncio.to_thread(
+                    self.vector_store.search,
+                    self._expand_query(query),
+                    search_type=search_type,
+                    limit=context_limit
+                )
+            )
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        semantic_scope = (search_type, context_limit, folder_id)
+        cached = self._semantic_cache.lookup(query_embedding, semantic_scope)
+        if cached is not None:
+            self._cache_answer(cache_key, cached)
+            return {**copy.deepcopy(cached), "cache_hit": True}
+        
+        try:
+            if not relevant_docs:
+                result = self._final_answer(None, [])
+            else:
+                print(f"Found {len(relevant_docs)} relevant document chunks")
+                formatted_context, sources = self._build_context(relevant_docs)
+                system_prompt, user_prompt = self._build_prompts(query, formatted_context)
+                
+                print("Generating answer with enhanced context...")
+                try:
+                    answer = await self.llm.aprocess_content(
+                        content="",
+                        prompt=user_prompt,
+                        system_prompt=system_prompt
+                    )
+                    result = self._final_answer(answer, sources)
+                except GoogleAPIError as e:
+                    result = self._error_answer(e, sources)
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        return self._store_answer(cache_key, query_embedding, semantic_scope, result)
+    
+    def stream_answer(self, query: str, search_type: str = "hybrid", context_limit: int = 5, folder_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a query like answer_query, streaming the answer as it is generated.
+        
+        Yields {"type": "delta", "text": ...} events as the LLM produces text,
+        then a single {"type": "done", ...} event with the same keys as
+        answer_query's result. Generation stops as soon as the answer turns
+        out to lack information; the done event's answer then replaces the
+        streamed text. Cached answers are served as a done event alone.
+        
+        Args:
+            query: User's question
+            search_type: Type of search to use (vector, keyword, hybrid)
+            context_limit: Maximum number of relevant documents to use
+            folder_id: Optional folder ID to constrain the search
+            
+        Raises:
+            ResearchAssistantError: If query processing fails
+        """
+        cache_key = hashlib.sha256(f"{query}|{search_type}|{context_limit}|{folder_id}".encode()).hexdigest()
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            yield {"type": "done", **cached, "cache_hit": True}
+            return
+        
+        try:
+            query_embedding = self.embed_query(query)
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        semantic_scope = (search_type, context_limit, folder_id)
+        cached = self._semantic_cache.lookup(query_embedding, semantic_scope)
+        if cached is not None:
+            self._cache_answer(cache_key, cached)
+            yield {"type": "done", **copy.deepcopy(cached), "cache_hit": True}
+            return
+        
+        try:
+            print(f"Searching for documents relevant to query using {search_type} search")
+            relevant_docs = self.vector_store.search(self._expand_query(query), search_type=search_type, limit=context_limit)
+            
+            if not relevant_docs:
+                result = self._final_answer(None, [])
+            else:
+                print(f"Found {len(relevant_docs)} relevant document chunks")
+                formatted_context, sources = self._build_context(relevant_docs)
+                system_prompt, user_prompt = self._build_prompts(query, formatted_context)
+                
+                print("Streaming answer with enhanced context...")
+                parts = []
+                tail = ""
+                lacking_info = False
+                try:
+                    stream = self.llm.stream_content(content="", prompt=user_prompt, system_prompt=system_prompt)
+                    with contextlib.closing(stream):
+                        for text in stream:
+                            # Check new text together with the end of the previous chunks
+                            window = tail + text
+                            if _LACK_INFO_RE.search(window):
+                                lacking_info = True
+                                break
+                            tail = window[-_LACK_INFO_WINDOW:]
+                            parts.append(text)
+                            yield {"type": "delta", "text": text}
+                    result = self._final_answer(None if lacking_info else "".join(parts), sources)
+                except GoogleAPIError as e:
+                    result = self._error_answer(e, sources)
+        except ResearchAssistantError:
+            raise
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        yield {"type": "done", **self._store_answer(cache_key, query_embedding, semantic_scope, result)}
+    
+    def _store_answer(self, cache_key: str, query_embedding: List[float], semantic_scope: Tuple, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a freshly computed answer (unless it is an error) and mark it as a cache miss."""
+        if "error" not in result:
+            self._cache_answer(cache_key, result)
+            self._semantic_cache.store(query_embedding, copy.deepcopy(result), semantic_scope)
+            self._answer_store.set(
+                f"semantic:{cache_key}",
+                (query_embedding, semantic_scope, result),
+                expire=self._semantic_cache.ttl
+            )
+        return {**result, "cache_hit": False}
+    
+    def _get_cached_answer(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached answer, or None if it is missing or expired."""
+        self._sync_answer_generation()
+        with self._answer_cache_lock:
+            entry = self._answer_cache.get(key)
+            if entry is not None:
+                expiry, result = entry
+                if time.monotonic() < expiry:
+                    self._answer_cache.move_to_end(key)
+                    return copy.deepcopy(result)
+                del self._answer_cache[key]
+        
+        # Fall back to answers persisted by an earlier process (or another worker)
+        result, expire_time = self._answer_store.get(f"answer:{key}", expire_time=True)
+        if result is None:
+            return None
+        self._remember_answer(key, result, expire_time - time.time())
+        return copy.deepcopy(result)
+    
+    def _cache_answer(self, key: str, result: Dict[str, Any]):
+        """Cache an answer in memory and on disk."""
+        self._remember_answer(key, result, self.ANSWER_CACHE_TTL)
+        self._answer_store.set(f"answer:{key}", result, expire=self.ANSWER_CACHE_TTL)
+    
+    def _remember_answer(self, key: str, result: Dict[str, Any], ttl: float):
+        """Keep an answer in the in-memory cache, evicting the least recently used entry when full."""
+        with self._answer_cache_lock:
+            self._answer_cache[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+            self._answer_cache.move_to_end(key)
+            if len(self._answer_cache) > self.ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
+    
+    def _restore_semantic_cache(self):
+        """Load the semantic cache entries persisted by earlier processes."""
+        ttl = self._semantic_cache.ttl
+        for key in self._answer_store.iterkeys():
+            if not key.startswith("semantic:"):
+                continue
+            entry, expire_time = self._answer_store.get(key, expire_time=True)
+            if entry is None:
+                continue
+            query_embedding, semantic_scope, result = entry
+            self._semantic_cache.store(query_embedding, result, semantic_scope, age=ttl - (expire_time - time.time()))
+    
+    def _sync_answer_generation(self):
+        """Drop this process's in-memory answers if another process has cleared the shared store since."""
+        generation = self._answer_store.get(self.ANSWER_GENERATION_KEY)
+        if generation != self._answer_generation:
+            self._answer_generation = generation
+            self._clear_memory_caches()
+    
+    def _clear_memory_caches(self):
+        """Drop the in-memory exact and semantic answer caches of this process."""
+        with self._answer_cache_lock:
+            self._answer_cache.clear()
+        self._semantic_cache.clear()
+    
+    def clear_answer_cache(self):
+        """
+        Drop all cached answers, e.g. after documents are added.
+        
+        Other processes sharing the answer store (such as gunicorn workers)
+        see the new generation on their next lookup and drop their in-memory
+        caches too.
+        """
+        self._clear_memory_caches()
+        self._answer_store.clear()
+        self._answer_generation = uuid.uuid4().hex
+        self._answer_store.set(self.ANSWER_GENERATION_KEY, self._answer_generation)
+    
+    def _answer_query(self, query: str, search_type: str, context_limit: int, folder_id: Optional[str]) -> Dict[str, Any]:
+        """Answer a query without consulting the answer cache (see answer_query)."""
         try:
             # Generate improved search query with query expansion
             expanded_query = self._expand_query(query)
@@ -197,52 +943,15 @@ class ResearchAssistant:
             relevant_docs = self.vector_store.search(expanded_query, search_type=search_type, limit=context_limit)
             
             if not relevant_docs:
-                return {
-                    "answer": "I don't have enough information to answer this question.",
-                    "sources": []
-                }
+                return self._final_answer(None, [])
             
             # Combine contents from relevant documents to create context
             print(f"Found {len(relevant_docs)} relevant document chunks")
-            
-            # Create organized context with sources
-            formatted_context = ""
-            sources = []
-            
-            for i, doc in enumerate(relevant_docs):
-                # Add formatted context
-                formatted_context += f"\n[Document {i+1}]: {doc['content']}\n"
-                
-                # Track sources without duplicates
-                source_info = {
-                    "title": doc.get("title", "Untitled"), 
-                    "source": doc["source"]
-                }
-                if source_info not in sources:
-                    sources.append(source_info)
+            formatted_context, sources = self._build_context(relevant_docs)
+            system_prompt, user_prompt = self._build_prompts(query, formatted_context)
             
             # Query the LLM with the context
             print("Generating answer with enhanced context...")
-            # SECURITY WARNING: The `query` (user question) and `formatted_context` (retrieved content)
-            # are combined into the prompt sent to the LLM. This is susceptible to Prompt Injection if
-            # the user query or the indexed document content contains malicious instructions.
-            # RECOMMENDATION: Implement robust prompt engineering. Clearly delimit user input vs. instructions.
-            # Consider input/output filtering or using more structured LLM API calls if available.
-            system_prompt = """You are a research assistant that provides accurate,
-            factual answers based solely on the provided documents.
-            Always attribute information to the specific document numbers [Document X] in your answer.
-            If the provided documents don't contain relevant information to answer the question,
-            say 'I don't have enough information to answer this question completely.'
-            Your response should be comprehensive, well-organized, and directly address the query."""
-            
-            user_prompt = f"""Question: {query}
-            
-            Context from documents:
-            {formatted_context}
-            
-            Answer the question using only information from these documents.
-            Cite document numbers using [Document X] format."""
-            
             try:
                 # SECURITY NOTE: Relies on `GoogleLLM.process_content` for actual API call.
                 # Ensure that method handles API keys securely and potentially sanitizes error messages.
@@ -252,24 +961,68 @@ class ResearchAssistant:
                     system_prompt=system_prompt
                 )
             except GoogleAPIError as e:
-                return {
-                    "answer": f"Error generating answer: {str(e)}",
-                    "sources": sources
-                }
+                return self._error_answer(e, sources)
             
-            # Verify answer relevance
-            if self._is_answer_lacking_info(answer):
-                return {
-                    "answer": "I don't have enough information to answer this question.",
-                    "sources": sources
-                }
+            return self._final_answer(answer, sources)
+        except Exception as e:
+            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+    
+    def _build_context(self, relevant_docs: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Number retrieved chunks into a prompt context and collect their unique sources.
+        
+        Args:
+            relevant_docs: Retrieved document chunks
             
+        Returns:
+            Tuple of (formatted context, list of sources)
+        """
+        context_parts = []
+        sources = []
+        seen_sources = set()
+        
+        for i, doc in enumerate(relevant_docs):
+            # Add formatted context
+            context_parts.append(f"\n[Document {i+1}]: {doc['content']}\n")
+            
+            # Track sources without duplicates
+            source_key = (doc.get("title", "Untitled"), doc["source"])
+            if source_key not in seen_sources:
+                seen_sources.add(source_key)
+                sources.append({"title": source_key[0], "source": source_key[1]})
+        
+        return "".join(context_parts), sources
+    
+    def _build_prompts(self, query: str, formatted_context: str) -> Tuple[str, str]:
+        """Build the system and user prompts for answering a query from retrieved context."""
+        # SECURITY WARNING: The `query` (user question) and `formatted_context` (retrieved content)
+        # are combined into the prompt sent to the LLM. This is susceptible to Prompt Injection if
+        # the user query or the indexed document content contains malicious instructions.
+        # RECOMMENDATION: Implement robust prompt engineering. Clearly delimit user input vs. instructions.
+        # Consider input/output filtering or using more structured LLM API calls if available.
+        return _SYSTEM_PROMPT, _USER_PROMPT_TEMPLATE.format(query=query, context=formatted_context)
+    
+    def _final_answer(self, answer: Optional[str], sources: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build the result for a generated answer, replacing answers that lack information."""
+        # Verify answer relevance
+        if not answer or self._is_answer_lacking_info(answer):
             return {
-                "answer": answer,
+                "answer": "I don't have enough information to answer this question.",
                 "sources": sources
             }
-        except Exception as e:
-            raise ResearchAssistantError(f"Error processing query: {str(e)}")
+        
+        return {
+            "answer": answer,
+            "sources": sources
+        }
+    
+    def _error_answer(self, error: Exception, sources: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build the result for a failed answer generation."""
+        return {
+            "answer": f"Error generating answer: {str(error)}",
+            "sources": sources,
+            "error": str(error)
+        }
     
     def _expand_query(self, query: str) -> str:
         """
@@ -286,17 +1039,8 @@ class ResearchAssistant:
             # To keep latency low, we'll use a simple approach instead of calling LLM
             # This can be enhanced with actual LLM calls in the future
             
-            # Remove question words and common filler words
-            expansion_stopwords = ["what", "when", "where", "who", "how", "why", "is", "are", "the", "a", "an", 
-                                  "of", "in", "on", "and", "or", "to", "from", "with"]
-            
-            query_words = query.lower().split()
-            keywords = [word for word in query_words if word not in expansion_stopwords and len(word) > 2]
-            
-            # Combine original query with extracted keywords
-            expanded_query = f"{query} {' '.join(keywords)}"
-            
-            return expanded_query
+            # Combine original query with its keywords (question and filler words removed)
+            return _expand_query_text(query)
         except Exception:
             # Fall back to original query if expansion fails
             return query
@@ -312,22 +1056,7 @@ class ResearchAssistant:
             True if the answer indicates insufficient information
         """
         # Look for phrases indicating lack of information
-        lack_info_phrases = [
-            "don't have enough information", 
-            "insufficient information",
-            "not enough context",
-            "cannot answer",
-            "unable to answer", 
-            "not provided in the documents",
-            "isn't mentioned in the documents"
-        ]
-        
-        lower_answer = answer.lower()
-        for phrase in lack_info_phrases:
-            if phrase in lower_answer:
-                return True
-                
-        return False
+        return bool(_LACK_INFO_RE.search(answer))
     
     def store_document_content(self, content: str, source: str, title: str = None, document_id: Optional[str] = None, folder_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -349,11 +1078,8 @@ class ResearchAssistant:
             
             # Use source as title if not provided
             if not title:
-                if source.startswith(('http://', 'https://')):
-                    parsed_url = urlparse(source)
-                    title = f"Content from {parsed_url.netloc}"
-                else:
-                    title = os.path.basename(source)
+                host, name = _source_parts(source)
+                title = f"Content from {host}" if host else name
             
             # Store in vector database
             doc_ids = self.vector_store.add_document(
@@ -364,6 +1090,8 @@ class ResearchAssistant:
                 folder_id=folder_id
             )
             
+            self.clear_answer_cache()
+            
             return {
                 "success": True,
                 "document_ids": doc_ids,
@@ -0,0 +1,195 @@
+"""
+Semantic answer cache for the Quetzal Research Assistant.
+Serves cached answers for repeated or paraphrased queries by comparing query embeddings.
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Optional: fall back to a brute-force scan
+    hnswlib = None
+
+class _MatrixIndex:
+    """Exact nearest-neighbor search over a matrix of unit vectors."""
+
+    def __init__(self, dim: int, max_elements: int):
+        # Rows past count are spare capacity, grown geometrically so adding is amortized O(1)
+        self.matrix = np.empty((min(max_elements, 64), dim), dtype=np.float32)
+        self.labels: List[int] = []  # Label of each used row
+        self.rows: Dict[int, int] = {}  # Row of each label
+        self.count = 0
+
+    def add(self, label: int, vec: np.ndarray):
+        if self.count == len(self.matrix):
+            grown = np.empty((max(2 * len(self.matrix), 1), self.matrix.shape[1]), dtype=np.float32)
+            grown[:self.count] = self.matrix[:self.count]
+            self.matrix = grown
+        self.matrix[self.count] = vec
+        self.labels.append(label)
+        self.rows[label] = self.count
+        self.count += 1
+
+    def remove(self, label: int):
+        # Move the last row into the freed one, so rows stay contiguous
+        row = self.rows.pop(label)
+        last = self.count - 1
+        moved = self.labels.pop()
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.labels[row] = moved
+            self.rows[moved] = row
+        self.count = last
+
+    def nearest(self, vec: np.ndarray) -> Optional[Tuple[int, float]]:
+        if not self.count:
+            return None
+        scores = self.matrix[:self.count] @ vec
+        best = int(np.argmax(scores))
+        return self.labels[best], float(scores[best])
+
+class _HnswIndex:
+    """Approximate nearest-neighbor search backed by an hnswlib HNSW graph."""
+
+    def __init__(self, dim: int, max_elements: int):
+        self.index = hnswlib.Index(space="cosine", dim=dim)
+        self.index.init_index(max_elements=max_elements, ef_construction=200, M=16, allow_replace_deleted=True)
+        self.index.set_ef(50)
+        self.count = 0
+
+    def add(self, label: int, vec: np.ndarray):
+        self.index.add_items(vec, [label], replace_deleted=True)
+        self.count += 1
+
+    def remove(self, label: int):
+        self.index.mark_deleted(label)
+        self.count -= 1
+
+    def nearest(self, vec: np.ndarray) -> Optional[Tuple[int, float]]:
+        if not self.count:
+            return None
+        labels, distances = self.index.knn_query(vec, k=1)
+        return int(labels[0][0]), 1.0 - float(distances[0][0])
+
+class SemanticCache:
+    """
+    In-memory cache of query answers keyed by embedding similarity.
+
+    Entries are partitioned by scope (e.g. folder and search type) so an answer
+    is never served across scopes. Each scope keeps an HNSW index of query
+    embeddings when hnswlib is installed, and a matrix of L2-normalized
+    embeddings scanned with one matrix-vector product otherwise.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl: float = 300, max_entries: int = 1000,
+                 use_hnsw: Optional[bool] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached answer to be served
+            ttl: Time-to-live of an entry (in seconds)
+            max_entries: Maximum number of entries kept per scope
+            use_hnsw: Whether to use an HNSW index (defaults to True when hnswlib is installed)
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if use_hnsw is None:
+            use_hnsw = hnswlib is not None
+        elif use_hnsw and hnswlib is None:
+            raise ImportError("hnswlib is required for use_hnsw=True")
+        self._index_class = _HnswIndex if use_hnsw else _MatrixIndex
+        self._scopes: Dict[Hashable, Dict[str, Any]] = {}
+        self._next_label = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _expire(self, bucket: Dict[str, Any], now: float):
+        """Drop expired entries from a scope, popping them off its expiry heap."""
+        expiries = bucket["expiries"]
+        while expiries and expiries[0][0] <= now:
+            _, label = heapq.heappop(expiries)
+            # Entries evicted earlier leave their heap item behind
+            if bucket["entries"].pop(label, None) is not None:
+                bucket["index"].remove(label)
+
+    def lookup(self, embedding: List[float], scope: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached value for a query embedding.
+
+        Args:
+            embedding: Embedding of the incoming query
+            scope: Partition key the query belongs to
+
+        Returns:
+            The cached value if a similar enough query was seen, None otherwise
+        """
+        vec = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._scopes.get(scope)
+            if bucket is None:
+                return None
+
+            self._expire(bucket, now)
+            match = bucket["index"].nearest(vec)
+            if match is None or match[1] < self.threshold:
+                return None
+
+            # Mark the entry as most recently used
+            bucket["entries"].move_to_end(match[0])
+            return bucket["entries"][match[0]]
+
+    def store(self, embedding: List[float], value: Dict[str, Any], scope: Hashable = None, age: float = 0):
+        """
+        Cache a value for a query embedding.
+
+        Args:
+            embedding: Embedding of the query
+            value: Value to serve for similar queries
+            scope: Partition key the query belongs to
+            age: Seconds since the value was computed (e.g. when restoring persisted entries)
+        """
+        vec = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._scopes.get(scope)
+            if bucket is None:
+                bucket = {
+                    "index": self._index_class(vec.shape[0], self.max_entries),
+                    "entries": OrderedDict(),  # Label -> value, least recently used first
+                    "expiries": []  # Heap of (expiry time, label)
+                }
+                self._scopes[scope] = bucket
+
+            self._expire(bucket, now)
+
+            # Evict the least recently used entry when the scope is full
+            if len(bucket["entries"]) >= self.max_entries:
+                lru, _ = bucket["entries"].popitem(last=False)
+                bucket["index"].remove(lru)
+
+            label = self._next_label
+            self._next_label += 1
+            bucket["index"].add(label, vec)
+            bucket["entries"][label] = value
+            heapq.heappush(bucket["expiries"], (now - age + self.ttl, label))
+
+    def clear(self):
+        """Remove all cached entries, e.g. after the document set changes."""
+        with self._lock:
+            self._scopes.clear()
@@ -0,0 +1,76 @@
+"""
+Near-duplicate detection for the Quetzal Research Assistant.
+Fingerprints document text with a 64-bit SimHash over word shingles.
+"""
+
+import hashlib
+import re
+import numpy as np
+
+# Words as compared by the fingerprint (case-insensitive)
+_WORD_RE = re.compile(r"\w+")
+
+class SimHash:
+    """
+    Incremental 64-bit SimHash of text.
+
+    Text can be fed in arbitrary pieces (e.g. while a page streams in); the
+    fingerprint is the same as for the concatenated text. Texts that differ
+    by small edits get fingerprints a few bits apart.
+    """
+
+    def __init__(self, shingle_size: int = 4):
+        """
+        Initialize the fingerprint.
+
+        Args:
+            shingle_size: Number of consecutive words hashed together as one feature
+        """
+        self.shingle_size = shingle_size
+        self._weights = np.zeros(64, dtype=np.int64)
+        self._shingles = 0
+        self._window = []  # Trailing words not yet covered by a full shingle
+        self._partial = ""  # Word fragment that may continue in the next piece
+
+    def _shingle(self, words):
+        """Split words into full shingles, returning them and the words left for the next shingle."""
+        count = max(len(words) - self.shingle_size + 1, 0)
+        shingles = [" ".join(words[i:i + self.shingle_size]) for i in range(count)]
+        return shingles, words[count:]
+
+    @staticmethod
+    def _weights_of(shingles):
+        """Sum the votes of shingles: +1 for each set bit of a shingle's hash and -1 for each clear bit."""
+        digests = b"".join(hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles)
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+        return 2 * bits.sum(axis=0, dtype=np.int64) - len(shingles)
+
+    def update(self, text: str):
+        """Feed the next piece of text."""
+        text = self._partial + text.lower()
+        words = _WORD_RE.findall(text)
+        self._partial = words.pop() if words and _WORD_RE.match(text[-1]) else ""
+        shingles, self._window = self._shingle(self._window + words)
+        if shingles:
+            self._weights += self._weights_of(shingles)
+            self._shingles += len(shingles)
+
+    def digest(self) -> int:
+        """Get the fingerprint of the text fed so far."""
+        words = self._window + ([self._partial] if self._partial else [])
+        shingles, _ = self._shingle(words)
+        if not self._shingles and not shingles and words:
+            # Text shorter than one shingle is a single feature
+            shingles = [" ".join(words)]
+        weights = self._weights + self._weights_of(shingles) if shingles else self._weights
+        return int("".join("1" if weight > 0 else "0" for weight in weights), 2)
+
+def simhash(text: str, shingle_size: int = 4) -> int:
+    """Compute the 64-bit SimHash of a text."""
+    hasher = SimHash(shingle_size)
+    hasher.update(text)
+    return hasher.digest()
+
+def hamming_distance(a: int, b: int) -> int:
+    """Count the bits in which two fingerprints differ."""
+    return (a ^ b).bit_count()
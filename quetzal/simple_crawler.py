@@ -3,23 +3,184 @@ Enhanced web crawler implementation for the Quetzal Research Assistant.
 Supports sitemap crawling, multi-level crawling, and respects robots.txt.
 """
 
+import asyncio
+import functools
 import logging
+import multiprocessing
+import os
+import threading
 import time
 import re
-from urllib.parse import urlparse, urljoin
-from typing import List, Dict, Set, Tuple, Optional, Any
-from collections import deque
-import requests
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Dict, Set, Tuple, Optional, Any, Callable, Iterator, Mapping
+import itertools
+from collections import OrderedDict, defaultdict
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
 from urllib.robotparser import RobotFileParser
-from simple_doc_processor import SimpleDocProcessor
+from simple_doc_processor import SimpleDocProcessor, REQUEST_TIMEOUT, create_session, html_to_text
+from crawl_store import CrawlStore
+from config.config import WEB_CRAWLER_CONFIG
+
+try:
+    from lxml import etree as LET
+    import lxml.html
+except ImportError:  # Optional: fall back to the standard library XML and HTML parsers
+    LET = None
+
+try:
+    from protego import Protego
+except ImportError:  # Optional: fall back to urllib.robotparser's linear rule scan
+    Protego = None
+
+# Sitemap protocol element names
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+_SITEMAP_TAG = _SITEMAP_NS + "sitemap"
+_URL_TAG = _SITEMAP_NS + "url"
+_LOC_TAG = _SITEMAP_NS + "loc"
+
+# Text of a sitemap entry's <loc>, as a compiled lxml XPath (plain strings, so entries can be freed)
+_LOC_XPATH = LET.XPath(
+    "string(sm:loc)",
+    namespaces={"sm": _SITEMAP_NS[1:-1]},
+    smart_strings=False
+) if LET is not None else None
+
+# Parse errors raised by the optional lxml backend
+_LXML_ERRORS = (LET.XMLSyntaxError,) if LET is not None else ()
+
+# BeautifulSoup tree builder: lxml's C parser when installed
+_HTML_PARSER = "lxml" if LET is not None else "html.parser"
+
+# Elements whose text is not page content
+_SKIPPED_TAGS = ("script", "style", "header", "footer", "nav")
+
+def _is_http_url(url: str) -> bool:
+    """Check for an absolute http(s) URL with a host, the common case of a valid URL, without parsing it."""
+    if url.startswith("https://"):
+        host_start = url[8:9]
+    elif url.startswith("http://"):
+        host_start = url[7:8]
+    else:
+        return False
+    # An empty slice is "in" any string, so a missing host fails here too
+    return host_start not in "/?#" and not host_start.isspace()
+
+@functools.lru_cache(maxsize=64)
+def _compile_patterns(url_patterns: Tuple[str, ...]) -> Tuple[re.Pattern, ...]:
+    """Compile URL filter patterns once per distinct pattern list."""
+    return tuple(re.compile(pattern) for pattern in url_patterns)
+
+# Query parameters that only track the visitor and never change the page
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"})
+
+# Ports implied by each scheme
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Runs of slashes in a URL path
+_SLASHES_RE = re.compile(r"/{2,}")
+
+@functools.lru_cache(maxsize=65536)
+def _canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that variants of the same page compare equal.
+    
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking query parameters, and collapses repeated and trailing slashes
+    in the path.
+    """
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname or ""
+        if ":" in host:
+            host = f"[{host}]"  # IPv6 literal
+        if parts.port is not None and parts.port != _DEFAULT_PORTS.get(scheme):
+            host += f":{parts.port}"
+    except ValueError:
+        return url  # Malformed port or host; compare as is
+    
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ])
+    path = _SLASHES_RE.sub("/", parts.path).rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, query, ""))
+
+def _robots_allow(robot_parser, url: str) -> bool:
+    """Check a URL against parsed robots.txt rules (a RobotFileParser or Protego parser)."""
+    if isinstance(robot_parser, RobotFileParser):
+        return robot_parser.can_fetch("*", url)
+    return robot_parser.can_fetch(url, "*")
+
+def _parse_html(html_content: str):
+    """Parse HTML with lxml, or return None if lxml is not installed or cannot take the input."""
+    if LET is None:
+        return None
+    try:
+        return lxml.html.fromstring(html_content)
+    except (ValueError, LET.ParserError):
+        # Empty documents, or strings carrying an XML encoding declaration
+        return None
+
+def _anchor_hrefs(html_content: str) -> List[str]:
+    """Get the href of every anchor in an HTML document, in page order."""
+    tree = _parse_html(html_content)
+    if tree is not None:
+        # Collect anchor targets with one XPath query in C, skipping the BeautifulSoup object graph
+        return tree.xpath("//a/@href")
+    soup = BeautifulSoup(html_content, _HTML_PARSER)
+    return [a_tag["href"] for a_tag in soup.find_all("a", href=True)]
+
+def _parse_page(html_content: str) -> Tuple[str, List[str]]:
+    """Extract (visible text, anchor hrefs) from a page; module-level so it can run in a worker process."""
+    return html_to_text(html_content), _anchor_hrefs(html_content)
+
+class _CappedReader:
+    """File-like view of a stream that ends after max_bytes, noting whether anything was cut off."""
+    
+    def __init__(self, stream, max_bytes: int):
+        self.stream = stream
+        self.remaining = max_bytes
+        self.truncated = False
+    
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            # Peek a byte to tell a stream ending exactly at the cap from a longer one
+            self.truncated = self.truncated or bool(self.stream.read(1))
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        return data
+
+def _matches_any(url: str, patterns: Tuple[re.Pattern, ...]) -> bool:
+    """Check whether a URL matches any of the compiled patterns."""
+    return any(pattern.search(url) for pattern in patterns)
 
 class SimpleCrawler:
     """
     Enhanced web crawler with support for sitemaps and multi-level crawling.
     """
     
+    # Pages fetched concurrently from a single host during a depth crawl
+    MAX_REQUESTS_PER_HOST = 2
+    
+    # Bounds for the per-host robots.txt cache
+    ROBOTS_CACHE_SIZE = 256
+    ROBOTS_TTL = 6 * 3600  # seconds
+    ROBOTS_ERROR_TTL = 15 * 60  # seconds; unreachable robots.txt files are retried sooner
+    ROBOTS_MAX_BYTES = 500_000  # Rules past this size are ignored, as by Googlebot
+    ROBOTS_VERDICT_CACHE_SIZE = 4096  # Memoized allow/deny verdicts kept per host
+    
+    # Sitemap content past this size (uncompressed) is ignored; the sitemap protocol allows 50 MB
+    SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+    
+    # Worker processes parsing pages during a depth crawl (below 2, pages are parsed on threads)
+    PARSE_WORKERS = WEB_CRAWLER_CONFIG["parse_workers"]
+    
     def __init__(self, respect_robots_txt: bool = True, 
                  crawl_delay: float = 1.0, 
                  max_pages: int = 100, 
@@ -34,13 +195,17 @@ class SimpleCrawler:
             max_depth: Maximum crawl depth
         """
         self.visited_urls = set()
-        self.processor = SimpleDocProcessor()
+        # Shared by the crawler and its document processor so connections to a host are reused
+        self.session = create_session()
+        self.processor = SimpleDocProcessor(session=self.session)
         self.respect_robots_txt = respect_robots_txt
         self.crawl_delay = crawl_delay
         self.max_pages = max_pages
         self.max_depth = max_depth
-        self.robot_parsers = {}  # Cache for robot parsers
-        self.last_request_time = 0
+        self.robot_parsers = OrderedDict()  # Robot parsers, expiry times and memoized verdicts, per host, in LRU order
+        self._robot_parsers_lock = threading.Lock()
+        self._next_request_time = {}  # Earliest time of the next request, per host
+        self._rate_limit_lock = threading.Lock()
         
         # Configure logging
         self.logger = logging.getLogger("SimpleCrawler")
@@ -53,6 +218,8 @@ class SimpleCrawler:
     
     def _is_valid_url(self, url: str) -> bool:
         """Check if a URL is valid."""
+        if _is_http_url(url):
+            return True
         try:
             result = urlparse(url)
             return all([result.scheme, result.netloc])
@@ -60,35 +227,80 @@ class SimpleCrawler:
             self.logger.error(f"Error validating URL {url}: {e}")
             return False
     
-    def _respect_rate_limits(self):
-        """Wait if necessary to respect rate limiting."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.crawl_delay:
-            time.sleep(self.crawl_delay - elapsed)
-        self.last_request_time = time.time()
+    def _respect_rate_limits(self, url: str):
+        """Wait if necessary so requests to the URL's host are at least crawl_delay apart."""
+        netloc = urlparse(url).netloc
+        with self._rate_limit_lock:
+            # Reserve the host's next request slot, so concurrent callers queue up behind each other
+            now = time.monotonic()
+            slot = max(now, self._next_request_time.get(netloc, now))
+            self._next_request_time[netloc] = slot + self.crawl_delay
+        if slot > now:
+            time.sleep(slot - now)
     
-    def _get_robot_parser(self, base_url: str) -> RobotFileParser:
-        """Get or create a robot parser for the given base URL."""
+    def _get_robot_parser(self, base_url: str):
+        """Get or create a robot parser (RobotFileParser or Protego) for the given base URL."""
         if not self.respect_robots_txt:
             return None
-            
+        return self._get_robot_rules(base_url)[0]
+    
+    def _get_robot_rules(self, base_url: str) -> Tuple[Any, Dict[str, bool]]:
+        """
+        Get or create the robots.txt entry for the given base URL's host.
+        
+        Returns:
+            Tuple of (robot parser, verdicts memoized per URL). The verdicts are
+            stored with their parser, so they are dropped together when the
+            robots.txt file is refreshed or the host is evicted.
+        """
         netloc = urlparse(base_url).netloc
-        if netloc in self.robot_parsers:
-            return self.robot_parsers[netloc]
+        with self._robot_parsers_lock:
+            entry = self.robot_parsers.get(netloc)
+            if entry is not None and time.monotonic() < entry[1]:
+                self.robot_parsers.move_to_end(netloc)
+                return entry[0], entry[2]
+        
+        robot_parser, ttl = self._fetch_robot_parser(urljoin(base_url, "/robots.txt"))
+        verdicts = {}
         
-        # Create new robot parser
-        robot_parser = RobotFileParser()
-        robots_url = urljoin(base_url, "/robots.txt")
+        with self._robot_parsers_lock:
+            self.robot_parsers[netloc] = (robot_parser, time.monotonic() + ttl, verdicts)
+            self.robot_parsers.move_to_end(netloc)
+            if len(self.robot_parsers) > self.ROBOTS_CACHE_SIZE:
+                self.robot_parsers.popitem(last=False)
+        return robot_parser, verdicts
+    
+    def _fetch_robot_parser(self, robots_url: str) -> Tuple[Any, float]:
+        """
+        Download and parse a robots.txt file through the shared session.
         
+        Rules are parsed with Protego when it is installed, which indexes them
+        for fast lookups and supports wildcards, and with RobotFileParser otherwise.
+        
+        Returns:
+            Tuple of (robot parser, seconds to cache it). Like RobotFileParser.read,
+            401/403 responses disallow everything and other errors allow everything.
+        """
+        robot_parser = RobotFileParser(robots_url)
         try:
-            self._respect_rate_limits()
-            robot_parser.set_url(robots_url)
-            robot_parser.read()
-            self.robot_parsers[netloc] = robot_parser
-            return robot_parser
+            self._respect_rate_limits(robots_url)
+            with self.session.get(robots_url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                if response.status_code == 200:
+                    body = response.raw.read(self.ROBOTS_MAX_BYTES, decode_content=True)
+                    robots_txt = body.decode("utf-8", "replace")
+                    if Protego is not None:
+                        return Protego.parse(robots_txt), self.ROBOTS_TTL
+                    robot_parser.parse(robots_txt.splitlines())
+                    return robot_parser, self.ROBOTS_TTL
+                if response.status_code in (401, 403):
+                    robot_parser.disallow_all = True
+                else:
+                    robot_parser.allow_all = True
+                return robot_parser, self.ROBOTS_ERROR_TTL
         except Exception as e:
             self.logger.warning(f"Failed to read robots.txt at {robots_url}: {e}")
-            return None
+            robot_parser.allow_all = True
+            return robot_parser, self.ROBOTS_ERROR_TTL
     
     def _can_fetch(self, url: str) -> bool:
         """Check if URL can be fetched according to robots.txt."""
@@ -96,10 +308,14 @@ class SimpleCrawler:
             return True
             
         try:
-            robot_parser = self._get_robot_parser(url)
-            if robot_parser:
-                return robot_parser.can_fetch("*", url)
-            return True
+            robot_parser, verdicts = self._get_robot_rules(url)
+            allowed = verdicts.get(url)
+            if allowed is None:
+                allowed = _robots_allow(robot_parser, url)
+                if len(verdicts) >= self.ROBOTS_VERDICT_CACHE_SIZE:
+                    verdicts.clear()
+                verdicts[url] = allowed
+            return allowed
         except Exception as e:
             self.logger.warning(f"Error checking robots.txt for {url}: {e}")
             return True
@@ -107,14 +323,20 @@ class SimpleCrawler:
     def extract_text(self, html_content: str) -> str:
         """Extract text content from HTML."""
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            
-            # Remove script and style elements
-            for script_or_style in soup(["script", "style", "header", "footer", "nav"]):
-                script_or_style.decompose()
+            tree = _parse_html(html_content)
+            if tree is not None:
+                # Parsed with lxml directly, skipping the BeautifulSoup object graph
+                LET.strip_elements(tree, LET.Comment, *_SKIPPED_TAGS, with_tail=False)
+                text = " ".join(tree.itertext())
+            else:
+                soup = BeautifulSoup(html_content, _HTML_PARSER)
+                
+                # Remove script and style elements
+                for script_or_style in soup(list(_SKIPPED_TAGS)):
+                    script_or_style.decompose()
+                text = soup.get_text(separator=" ")
             
-            # Get text and remove extra whitespace
-            text = soup.get_text(separator=" ")
+            # Remove extra whitespace
             text = " ".join(text.split())
             
             self.logger.info(f"Extracted {len(text)} characters of text content")
@@ -137,39 +359,43 @@ class SimpleCrawler:
             List of extracted links
         """
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            links = []
-            
-            for a_tag in soup.find_all("a", href=True):
-                href = a_tag["href"]
-                
-                # If base_url is provided, resolve relative URLs
-                if base_url:
-                    full_url = urljoin(base_url, href)
-                    
-                    # Check if the URL matches the patterns (if provided)
-                    if url_patterns:
-                        if not any(re.search(pattern, full_url) for pattern in url_patterns):
-                            continue
-                    
-                    # Only include links to the same domain by default
-                    base_domain = urlparse(base_url).netloc
-                    url_domain = urlparse(full_url).netloc
-                    
-                    # Accept the URL if it's from the same domain or subdomain
-                    if url_domain == base_domain or url_domain.endswith(f".{base_domain}"):
-                        if self._is_valid_url(full_url) and self._can_fetch(full_url):
-                            links.append(full_url)
-                elif self._is_valid_url(href) and self._can_fetch(href):
-                    # If no base_url, just collect all valid URLs
-                    links.append(href)
-            
+            patterns = _compile_patterns(tuple(url_patterns)) if url_patterns else ()
+            links = self._filter_links(_anchor_hrefs(html_content), base_url, patterns)
             self.logger.info(f"Extracted {len(links)} links")
             return links
         except Exception as e:
             self.logger.error(f"Error extracting links from HTML: {e}")
             return []
     
+    def _filter_links(self, hrefs: List[str], base_url: str = "", patterns: Tuple[re.Pattern, ...] = ()) -> List[str]:
+        """Resolve, dedupe and filter a page's hrefs into the links worth crawling (see extract_links)."""
+        # If base_url is provided, resolve relative URLs; dedupe by canonical URL (keeping page order) before filtering
+        if base_url:
+            hrefs = [urljoin(base_url, href) for href in hrefs]
+        candidates = {}
+        for href in hrefs:
+            candidates.setdefault(_canonicalize_url(href), href)
+        candidates = candidates.values()
+        
+        if not base_url:
+            # If no base_url, just collect all valid URLs
+            return [href for href in candidates if self._is_valid_url(href) and self._can_fetch(href)]
+        
+        links = []
+        # Only include links to the same domain (or a subdomain) by default
+        base_domain = urlparse(base_url).netloc
+        subdomain_suffix = f".{base_domain}"
+        for full_url in candidates:
+            # Check if the URL matches the patterns (if provided)
+            if patterns and not _matches_any(full_url, patterns):
+                continue
+            
+            url_domain = urlparse(full_url).netloc
+            if url_domain == base_domain or url_domain.endswith(subdomain_suffix):
+                if self._is_valid_url(full_url) and self._can_fetch(full_url):
+                    links.append(full_url)
+        return links
+    
     def parse_sitemap(self, sitemap_url: str) -> List[str]:
         """
         Parse a sitemap XML file and extract URLs.
@@ -180,57 +406,56 @@ class SimpleCrawler:
         Returns:
             List of URLs from the sitemap
         """
+        return list(self.iter_sitemap_urls(sitemap_url))
+    
+    def iter_sitemap_urls(self, sitemap_url: str) -> Iterator[str]:
+        """
+        Stream the URLs listed in a sitemap, following sitemap indexes.
+        
+        The XML is parsed incrementally as it downloads and each entry is
+        released once read, so memory does not grow with the sitemap size.
+        
+        Args:
+            sitemap_url: URL of the sitemap to parse
+            
+        Yields:
+            URLs from the sitemap, as they are parsed
+        """
+        child_sitemaps = []
+        count = 0
         try:
             # SECURITY WARNING: Fetching arbitrary sitemap URLs can lead to SSRF if `sitemap_url`
             # is influenced by user input without validation against private IPs.
             # RECOMMENDATION: Validate `sitemap_url` similar to other external URLs if it can be untrusted.
             self.logger.info(f"Parsing sitemap: {sitemap_url}")
-            self._respect_rate_limits()
-            # SECURITY NOTE: Consider adding User-Agent header.
-            response = requests.get(sitemap_url, timeout=30)
-            
-            if response.status_code != 200:
-                self.logger.warning(f"Failed to fetch sitemap {sitemap_url}: HTTP {response.status_code}")
-                return []
-                
-            # Check if it's a sitemap index (contains other sitemaps)
-            if "<sitemapindex" in response.text:
-                urls = []
-                # SECURITY WARNING: Parsing XML from external sources can be vulnerable to XXE and DoS (e.g., Billion Laughs).
-                # `xml.etree.ElementTree` is generally safer against XXE by default in modern Python, but ensure external entity loading is disabled.
-                # RECOMMENDATION: Consider adding limits to response size before parsing to prevent DoS. Ensure parser is securely configured if using libraries like lxml.
-                root = ET.fromstring(response.text)
+            self._respect_rate_limits(sitemap_url)
+            with self.session.get(sitemap_url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                if response.status_code != 200:
+                    self.logger.warning(f"Failed to fetch sitemap {sitemap_url}: HTTP {response.status_code}")
+                    return
+                response.raw.decode_content = True  # Undo gzip/deflate transfer encoding
                 
-                # Extract sitemap URLs from the index
-                for sitemap in root.findall(".//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap"):
-                    loc = sitemap.find("{http://www.sitemaps.org/schemas/sitemap/0.9}loc")
-                    if loc is not None and loc.text:
-                        # Recursively parse each sitemap
-                        child_urls = self.parse_sitemap(loc.text)
-                        urls.extend(child_urls)
-                
-                return urls
-            else:
-                # Process regular sitemap
-                urls = []
-                # SECURITY WARNING: XML parsing risks (XXE, DoS) apply here too. See above.
-                root = ET.fromstring(response.text)
-                
-                # Extract URLs
-                for url in root.findall(".//{http://www.sitemaps.org/schemas/sitemap/0.9}url"):
-                    loc = url.find("{http://www.sitemaps.org/schemas/sitemap/0.9}loc")
-                    if loc is not None and loc.text:
-                        urls.append(loc.text)
-                
-                self.logger.info(f"Found {len(urls)} URLs in sitemap")
-                return urls
-        except ET.ParseError:
+                # Cap the decompressed size, so a huge or endless response cannot tie up the parser
+                body = _CappedReader(response.raw, self.SITEMAP_MAX_BYTES)
+                for tag, loc in self._iter_sitemap_entries(body):
+                    if tag == _SITEMAP_TAG:
+                        # Sitemap index entry: parsed once this index is fully read
+                        child_sitemaps.append(loc)
+                    else:
+                        count += 1
+                        yield loc
+                if body.truncated:
+                    self.logger.warning(f"Sitemap {sitemap_url} exceeds {self.SITEMAP_MAX_BYTES} bytes; ignoring the rest")
+        except (ET.ParseError, *_LXML_ERRORS):
             # Some sitemaps might be in a different format or compressed
             self.logger.warning(f"Failed to parse XML from sitemap {sitemap_url}")
-            return []
         except Exception as e:
             self.logger.error(f"Error parsing sitemap {sitemap_url}: {e}")
-            return []
+        
+        if count:
+            self.logger.info(f"Found {count} URLs in sitemap")
+        for child_sitemap in child_sitemaps:
+            yield from self.iter_sitemap_urls(child_sitemap)
     
     def crawl(self, file_path_or_url: str) -> Tuple[Optional[str], List[str]]:
         """
@@ -244,24 +469,23 @@ class SimpleCrawler:
         """
         try:
             # Check if it's a URL or a file
-            if file_path_or_url.startswith('http://') or file_path_or_url.startswith('https://'):
+            if file_path_or_url.startswith(('http://', 'https://')):
                 # SECURITY WARNING: Potential SSRF risk if `file_path_or_url` is untrusted.
-                # The actual request happens in `self.processor.get_html_from_url` and `self.processor.process_url`.
+                # The actual request happens in `self.processor.fetch_html`.
                 # Validation should occur there or before calling this method.
-                # Get HTML content from URL
-                self._respect_rate_limits()
-                html_content = self.processor.get_html_from_url(file_path_or_url)
+                # Get HTML and text content from URL with a single request
+                html_content = self._download(file_path_or_url)
                 if not html_content:
                     return None, []
-                    
-                # Extract text from the URL
-                content = self.processor.process_url(file_path_or_url)
+                content = html_to_text(html_content)
                 
                 # Extract links using the base URL
                 links = self.extract_links(html_content, file_path_or_url)
                 
                 return content, links
-            elif file_path_or_url.endswith('.md'):
+            
+            extension = os.path.splitext(file_path_or_url)[1].lower()
+            if extension == '.md':
                 # Get HTML content from markdown
                 html_content = self.processor.get_html_from_markdown(file_path_or_url)
                 if not html_content:
@@ -274,13 +498,9 @@ class SimpleCrawler:
                 links = self.extract_links(html_content)
                 
                 return content, links
-            elif file_path_or_url.endswith('.txt'):
-                # For text files, just get the content, no links
-                content = self.processor.process_text_file(file_path_or_url)
-                return content, []
-            elif file_path_or_url.endswith('.pdf'):
-                # For PDF files, just get the content, no links
-                content = self.processor.process_pdf_file(file_path_or_url)
+            elif extension in self.processor.EXTENSION_HANDLERS:
+                # For text and PDF files, just get the content, no links
+                content = getattr(self.processor, self.processor.EXTENSION_HANDLERS[extension])(file_path_or_url)
                 return content, []
             else:
                 self.logger.warning(f"Unsupported file type or URL: {file_path_or_url}")
@@ -292,18 +512,64 @@ class SimpleCrawler:
     def crawl_with_depth(self, start_url: str, 
                          max_depth: int = None, 
                          max_pages: int = None,
-                         url_patterns: List[str] = None) -> Dict[str, str]:
+                         url_patterns: List[str] = None,
+                         output_path: Optional[str] = None,
+                         on_page: Optional[Callable[[str, str], None]] = None) -> Mapping[str, str]:
         """
         Crawl a website starting from a URL with depth limit.
         
+        Runs acrawl_with_depth on a new event loop, so it must not be called
+        from a coroutine (await acrawl_with_depth there instead).
+        
         Args:
             start_url: Starting URL for crawling
             max_depth: Maximum crawl depth (overrides instance value if provided)
             max_pages: Maximum number of pages to crawl (overrides instance value if provided)
             url_patterns: List of regex patterns to match URLs against
+            output_path: SQLite file to write pages to as they are crawled (see acrawl_with_depth)
+            on_page: Called with (url, content) as each page is crawled (see acrawl_with_depth)
             
         Returns:
-            Dictionary mapping URLs to their extracted content
+            Mapping of URLs to their extracted content
+        """
+        return asyncio.run(self.acrawl_with_depth(start_url, max_depth, max_pages, url_patterns, output_path=output_path, on_page=on_page))
+    
+    async def acrawl_with_depth(self, start_url: str, 
+                                max_depth: int = None, 
+                                max_pages: int = None,
+                                url_patterns: List[str] = None,
+                                max_concurrency: int = 16,
+                                output_path: Optional[str] = None,
+                                on_page: Optional[Callable[[str, str], None]] = None) -> Mapping[str, str]:
+        """
+        Crawl a website breadth-first, fetching each depth level concurrently.
+        
+        Pages are fetched on a pool of max_concurrency worker threads, at most
+        MAX_REQUESTS_PER_HOST per host, with requests to a host spaced
+        crawl_delay apart, so a slow or rate-limited host does not hold up
+        the others. With PARSE_WORKERS set to 2 or more, downloaded pages are
+        parsed in worker processes started for the crawl, so parsing overlaps
+        other pages' downloads instead of contending for the GIL.
+        
+        With output_path, pages are written to a CrawlStore as they are
+        crawled instead of being held in memory. Pages already in the store
+        are replayed from it rather than fetched again, so an interrupted
+        crawl can be resumed by running it again with the same path.
+        
+        Args:
+            start_url: Starting URL for crawling
+            max_depth: Maximum crawl depth (overrides instance value if provided)
+            max_pages: Maximum number of pages to crawl (overrides instance value if provided)
+            url_patterns: List of regex patterns to match URLs against
+            max_concurrency: Maximum number of pages fetched at once
+            output_path: SQLite file to write pages to as they are crawled (None keeps them in memory)
+            on_page: Called with (url, content) as each page is crawled, so callers can
+                process pages while the crawl continues; it runs on the event loop and
+                must not block
+            
+        Returns:
+            Mapping of URLs to their extracted content, in crawl order: a dict,
+            or the CrawlStore when output_path is given
         """
         if not max_depth:
             max_depth = self.max_depth
@@ -311,68 +577,172 @@ class SimpleCrawler:
         if not max_pages:
             max_pages = self.max_pages
         
-        # Initialize crawl queue and visited set
-        queue = deque([(start_url, 0)])  # (url, depth)
-        visited = set()
-        results = {}
+        patterns = _compile_patterns(tuple(url_patterns)) if url_patterns else ()
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.MAX_REQUESTS_PER_HOST))
+        # A dedicated pool, as the default executor may have fewer threads than max_concurrency
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="crawler")
+        parse_pool = self._new_parse_pool()
+        loop = asyncio.get_running_loop()
         
-        # Check for sitemap.xml first
-        sitemap_url = urljoin(start_url, "/sitemap.xml")
-        try:
-            # SECURITY WARNING: Potential SSRF risk if `sitemap_url` is derived from untrusted input.
-            self._respect_rate_limits()
-            # SECURITY NOTE: Consider adding User-Agent header.
-            response = requests.head(sitemap_url, timeout=10)
-            if response.status_code == 200:
-                self.logger.info(f"Found sitemap at {sitemap_url}")
-                sitemap_urls = self.parse_sitemap(sitemap_url) # Parsing happens here, XML risks apply.
-                
-                # Add sitemap URLs to the queue
-                for url in sitemap_urls:
-                    if url not in visited:
-                        queue.append((url, 0))
-        except Exception as e:
-            self.logger.warning(f"Failed to check sitemap at {sitemap_url}: {e}")
+        store = CrawlStore(output_path) if output_path else None
+        results = {}  # Crawled pages, when they are not written to the store
         
-        # Start crawling
-        page_count = 0
-        while queue and page_count < max_pages:
-            url, depth = queue.popleft()
-            
-            # Skip if already visited or too deep
-            if url in visited or depth > max_depth:
-                continue
-                
-            visited.add(url)
-            
-            # Process URL
-            self.logger.info(f"Crawling {url} (depth {depth})")
-            content, links = self.crawl(url)
+        async def fetch(url):
+            if store is not None:
+                page = store.get_page(url)
+                if page is not None:
+                    return page
+            if not url.startswith(('http://', 'https://')):
+                return await loop.run_in_executor(executor, self.crawl, url)
             
-            if content:
-                results[url] = content
-                page_count += 1
-                
-                self.logger.info(f"Processed page {page_count}/{max_pages}")
+            async with host_limits[urlparse(url).netloc]:
+                self.logger.info(f"Crawling {url}")
+                html_content = await loop.run_in_executor(executor, self._download, url)
+            if not html_content:
+                return None, []
+            content, hrefs = await loop.run_in_executor(parse_pool or executor, _parse_page, html_content)
+            # Filter on a thread, as checking robots.txt may fetch it
+            links = await loop.run_in_executor(executor, self._filter_links, hrefs, url)
+            return content, links
+        
+        # Start from the page itself plus any sitemap entries, read as the sitemap streams in
+        frontier = itertools.chain([start_url], self._sitemap_urls(start_url))
+        visited = set()  # Canonical URLs, so variants of a page are fetched once
+        page_count = 0
+        
+        try:
+            for depth in range(max_depth + 1):
+                next_frontier = {}  # Canonical URL -> first raw URL linking to it, in discovery order
+                while page_count < max_pages:
+                    # Fetch only as many pages as could still count towards max_pages
+                    batch = await asyncio.to_thread(self._take_unvisited, frontier, visited, max_pages - page_count)
+                    if not batch:
+                        break
+                    pages = await asyncio.gather(*(fetch(url) for url in batch), return_exceptions=True)
+                    
+                    for url, page in zip(batch, pages):
+                        if isinstance(page, Exception):
+                            self.logger.error(f"Error crawling {url}: {page}")
+                            continue
+                        content, links = page
+                        if not content:
+                            continue
+                        
+                        if store is not None:
+                            store.add(url, content, links)
+                        else:
+                            results[url] = content
+                        page_count += 1
+                        self.logger.info(f"Processed page {page_count}/{max_pages} (depth {depth})")
+                        if on_page is not None:
+                            on_page(url, content)
+                        
+                        # Apply URL pattern filtering, then queue each unvisited page once for the next depth level
+                        if patterns:
+                            links = [link for link in links if _matches_any(link, patterns)]
+                        for canonical_url, link in zip(map(_canonicalize_url, links), links):
+                            if canonical_url not in visited:
+                                next_frontier.setdefault(canonical_url, link)
                 
-                # Stop if we've reached the maximum pages
                 if page_count >= max_pages:
                     self.logger.info(f"Reached maximum page count ({max_pages})")
                     break
-                
-                # Add links to queue for next depth level
-                if depth < max_depth:
-                    for link in links:
-                        # Apply URL pattern filtering
-                        if url_patterns:
-                            if not any(re.search(pattern, link) for pattern in url_patterns):
-                                continue
-                                
-                        if link not in visited:
-                            queue.append((link, depth + 1))
+                frontier = iter(next_frontier.values())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=False, cancel_futures=True)
             
         self.logger.info(f"Crawling completed: {page_count} pages processed")
-        return results
+        return store if store is not None else results
+    
+    def _download(self, url: str) -> Optional[str]:
+        """Fetch a page's HTML, waiting out the host's crawl delay first."""
+        self._respect_rate_limits(url)
+        return self.processor.fetch_html(url)
+    
+    def _new_parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Start a process pool for parsing one crawl's pages (None if pages are parsed on threads)."""
+        if self.PARSE_WORKERS < 2:
+            return None  # A single worker process would only add pickling overhead
+        # Spawn rather than fork, as the crawler runs threads
+        return ProcessPoolExecutor(
+            max_workers=self.PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    
+    @staticmethod
+    def _iter_sitemap_entries(stream) -> Iterator[Tuple[str, str]]:
+        """
+        Parse sitemap XML incrementally, yielding (entry tag, location) for each <sitemap> and <url> entry.
+        
+        Uses lxml when installed, which is faster and recovers from malformed
+        markup; each entry is released once read with either parser.
+        """
+        # SECURITY WARNING: Parsing XML from external sources can be vulnerable to XXE and DoS (e.g., Billion Laughs).
+        # The lxml parser is configured not to resolve entities or load anything from the network;
+        # `xml.etree.ElementTree` does not resolve external entities in modern Python.
+        # Callers should cap the stream size (see SITEMAP_MAX_BYTES) to bound parsing work.
+        if LET is not None:
+            entries = LET.iterparse(
+                stream,
+                events=("end",),
+                tag=(_SITEMAP_TAG, _URL_TAG),
+                recover=True,
+                resolve_entities=False,
+                no_network=True,
+                huge_tree=False
+            )
+            for _, elem in entries:
+                loc = _LOC_XPATH(elem).strip()
+                if loc:
+                    yield elem.tag, loc
+                # Release the entry and the already-read entries before it
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            return
+        
+        root = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event != "end" or elem.tag not in (_SITEMAP_TAG, _URL_TAG):
+                continue
+            loc = elem.findtext(_LOC_TAG)
+            if loc:
+                yield elem.tag, loc.strip()
+            # Release the entry (entries are direct children of the root)
+            root.clear()
+    
+    def _sitemap_urls(self, start_url: str) -> Iterator[str]:
+        """Stream the URLs listed in the site's sitemap.xml, if it has one."""
+        sitemap_url = urljoin(start_url, "/sitemap.xml")
+        try:
+            # SECURITY WARNING: Potential SSRF risk if `sitemap_url` is derived from untrusted input.
+            self._respect_rate_limits(sitemap_url)
+            response = self.session.head(sitemap_url, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                return
+        except Exception as e:
+            self.logger.warning(f"Failed to check sitemap at {sitemap_url}: {e}")
+            return
+        
+        self.logger.info(f"Found sitemap at {sitemap_url}")
+        yield from self.iter_sitemap_urls(sitemap_url) # Parsing happens here, XML risks apply.
+    
+    @staticmethod
+    def _take_unvisited(urls: Iterator[str], visited: Set[str], count: int) -> List[str]:
+        """Take up to count URLs whose canonical form was not visited yet from an iterator, marking them visited."""
+        batch = []
+        for url in urls:
+            canonical_url = _canonicalize_url(url)
+            if canonical_url not in visited:
+                visited.add(canonical_url)
+                batch.append(url)
+                if len(batch) >= count:
+                    break
+        return batch
     
     def check_sitemap(self, base_url: str) -> bool:
         """
@@ -387,9 +757,8 @@ class SimpleCrawler:
         sitemap_url = urljoin(base_url, "/sitemap.xml")
         try:
             # SECURITY WARNING: Potential SSRF risk if `sitemap_url` is derived from untrusted input.
-            self._respect_rate_limits()
-            # SECURITY NOTE: Consider adding User-Agent header.
-            response = requests.head(sitemap_url, timeout=10)
+            self._respect_rate_limits(sitemap_url)
+            response = self.session.head(sitemap_url, timeout=REQUEST_TIMEOUT)
             return response.status_code == 200
         except Exception as e:
             self.logger.warning(f"Error checking sitemap at {sitemap_url}: {e}")
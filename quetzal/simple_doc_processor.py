@@ -3,16 +3,142 @@ Simple document processor for testing the Smart Research Assistant.
 """
 
 import os
+import re
+import codecs
+import functools
+from pathlib import Path
+from html.parser import HTMLParser
 import markdown2
 import requests
-from PyPDF2 import PdfReader
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pypdf import PdfReader
+from config.config import WEB_CRAWLER_CONFIG
+
+try:
+    import pymupdf
+except ImportError:  # Optional: fall back to pypdf's pure-Python text extraction
+    pymupdf = None
+
+# (connect, read) timeout in seconds for every HTTP request
+REQUEST_TIMEOUT = (5, 30)
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9._:-]+)""", re.IGNORECASE)
+
+def _response_encoding(response, head):
+    """
+    Pick the encoding of an HTTP response body, given its first bytes.
+    
+    A charset in the Content-Type header wins. Without one, requests reports
+    ISO-8859-1 for any text/* response, so instead a byte order mark or
+    <meta> charset in the head is used, falling back to UTF-8.
+    """
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = _META_CHARSET_RE.search(head[:4096])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass  # Unknown charset name
+    return "utf-8"
+
+def create_session(pool_size=64):
+    """
+    Create an HTTP session that keeps connections alive between requests.
+    
+    Up to pool_size connections per host are pooled, so repeated requests to
+    a host skip the TCP and TLS handshakes. Connection errors are retried
+    twice with backoff.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = WEB_CRAWLER_CONFIG["user_agent"]
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@functools.lru_cache(maxsize=128)
+def _cached_markdown_html(file_path, mtime_ns, size):
+    """
+    Convert a markdown file to HTML, memoized per file version.
+    
+    The modification time and size are part of the cache key, so an edited
+    file is converted again instead of serving stale HTML.
+    """
+    # One raw read, no text-mode wrapper; markdown2 normalizes line endings itself
+    return markdown2.markdown(Path(file_path).read_bytes().decode("utf-8"))
+
+def _markdown_html(file_path):
+    """Get the HTML of a markdown file, reusing the conversion while the file is unchanged."""
+    stat = os.stat(file_path)
+    return _cached_markdown_html(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+class _TextExtractor(HTMLParser):
+    """Incremental HTML parser that collects visible text as markup is fed in."""
+    
+    SKIPPED_TAGS = {"script", "style", "header", "footer", "nav"}
+    
+    def __init__(self):
+        super().__init__()
+        self.pieces = []
+        self.skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+        self.pieces.append(" ")
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        self.pieces.append(" ")
+    
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.pieces.append(data)
+    
+    def drain(self):
+        """Return and clear the text collected so far."""
+        text = "".join(self.pieces)
+        self.pieces = []
+        return text
+
+def html_to_text(html_content):
+    """Extract the visible text of an HTML document, with whitespace collapsed to single spaces."""
+    parser = _TextExtractor()
+    parser.feed(html_content)
+    parser.close()
+    return " ".join(parser.drain().split())
 
 class SimpleDocProcessor:
     """
     A simple document processor that extracts text from markdown files, text files, PDF files, and URLs.
     """
     
+    # Method used for each supported file extension
+    EXTENSION_HANDLERS = {
+        ".pdf": "process_pdf_file",
+        ".md": "process_markdown_file",
+        ".txt": "process_text_file"
+    }
+    
+    def __init__(self, session=None):
+        """
+        Initialize the processor.
+        
+        Args:
+            session: HTTP session used to fetch URLs (a pooled session is created if not provided)
+        """
+        self.session = session or create_session()
+    
     def process_text_file(self, file_path):
         """Process a .txt file and return its content."""
         # SECURITY WARNING: This method takes a file path. If `file_path` originates from untrusted user input
@@ -46,30 +172,11 @@ class SimpleDocProcessor:
             return None
             
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                markdown_content = file.read()
-            
-            # Convert markdown to HTML and then extract text
-            html_content = markdown2.markdown(markdown_content)
+            # Convert markdown to HTML and then extract text in one parsing pass
+            html_content = _markdown_html(file_path)
             
-            # SECURITY WARNING: Rudimentary HTML tag stripping using replace() is insecure and easily bypassed.
-            # If the output text is ever used in an HTML context, this could lead to XSS.
-            # RECOMMENDATION: Use a robust HTML parsing/stripping library like BeautifulSoup.
-            # Example:
-            # from bs4 import BeautifulSoup
-            # soup = BeautifulSoup(html_content, "html.parser")
-            # text_content = soup.get_text(separator="\n", strip=True)
-
-            # Placeholder: Original insecure code left for now
-            # Simple cleaning of HTML tags
-            text_content = html_content.replace("<br>", "\n").replace("<p>", "\n").replace("</p>", "\n")
-            for tag in ["<h1>", "</h1>", "<h2>", "</h2>", "<h3>", "</h3>", "<h4>", "</h4>",
-                        "<h5>", "</h5>", "<h6>", "</h6>", "<ul>", "</ul>", "<li>", "</li>",
-                        "<ol>", "</ol>", "<code>", "</code>", "<pre>", "</pre>"]:
-                text_content = text_content.replace(tag, "\n")
-            
-            # Clean up extra whitespace
-            text_content = " ".join(text_content.split())
+            # All tags are removed by an HTML parser (not string replacement), so no markup survives
+            text_content = html_to_text(html_content)
             
             print(f"Successfully processed markdown file: {file_path}")
             return text_content
@@ -81,27 +188,32 @@ class SimpleDocProcessor:
         """Process a .pdf file and return its content."""
         # SECURITY WARNING: Potential LFI risk if `file_path` is untrusted (see process_text_file).
         # Also, PDF parsing libraries can be vulnerable to DoS with malformed files.
-        # RECOMMENDATION: Keep PyPDF2 updated. Consider resource limits/timeouts if processing untrusted PDFs.
+        # RECOMMENDATION: Keep pypdf updated. Consider resource limits/timeouts if processing untrusted PDFs.
         if not os.path.exists(file_path):
             print(f"File does not exist: {file_path}")
             return None
             
         try:
-            with open(file_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ''
-                for page in reader.pages:
-                    text += page.extract_text() + '\n'
-                
-                # Clean up extra whitespace
-                text = " ".join(text.split())
-                
-                print(f"Successfully processed PDF file: {file_path}")
-                return text
+            if pymupdf is not None:
+                # PyMuPDF extracts text in C, many times faster than pypdf
+                with pymupdf.open(file_path) as doc:
+                    text = self._join_pdf_pages(page.get_text("text") for page in doc)
+            else:
+                with open(file_path, 'rb') as file:
+                    reader = PdfReader(file)
+                    text = self._join_pdf_pages(page.extract_text() for page in reader.pages)
+            
+            print(f"Successfully processed PDF file: {file_path}")
+            return text
         except Exception as e:
             print(f"Error processing PDF file {file_path}: {e}")
             return None
     
+    @staticmethod
+    def _join_pdf_pages(pages):
+        """Clean up extra whitespace page by page, then join the non-empty pages once."""
+        return " ".join(filter(None, (" ".join((page or "").split()) for page in pages)))
+    
     def process_url(self, url):
         """Fetch and process content from a URL."""
         # SECURITY WARNING: This method fetches content from an arbitrary URL. If `url` originates
@@ -119,30 +231,52 @@ class SimpleDocProcessor:
         # except socket.gaierror: raise ValueError("Could not resolve hostname")
         
         try:
-            # SECURITY NOTE: Consider adding a User-Agent header for politeness.
-            # headers = {'User-Agent': 'QuetzalBot/1.0'}
-            # response = requests.get(url, headers=headers, timeout=30) # Add timeout
-            response = requests.get(url) # Placeholder: Original code left
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Remove script and style elements
-                for script_or_style in soup(["script", "style", "header", "footer", "nav"]):
-                    script_or_style.decompose()
-                
-                # Get text and remove extra whitespace
-                text = soup.get_text(separator=" ")
-                text = " ".join(text.split())
-                
-                print(f"Successfully processed URL: {url}")
-                return text
-            else:
-                print(f"Failed to fetch URL: {url} with status code: {response.status_code}")
-                return None
+            text = "".join(self.iter_url_text(url))
+            print(f"Successfully processed URL: {url}")
+            return text
         except Exception as e:
             print(f"Error processing URL {url}: {e}")
             return None
     
+    def iter_url_text(self, url, chunk_size=65536):
+        """
+        Stream the visible text of a URL as it downloads.
+        
+        The response body is read chunk_size bytes at a time and fed to an
+        incremental HTML parser, so the page is never held in memory whole.
+        Whitespace is collapsed to single spaces, as in process_url.
+        
+        Raises:
+            ValueError: If the URL does not return a 200 response
+        """
+        # SECURITY WARNING: Potential SSRF risk if `url` is untrusted (see process_url).
+        with self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise ValueError(f"Failed to fetch URL: {url} with status code: {response.status_code}")
+            
+            decoder = None  # Created once the first bytes show the page's encoding
+            parser = _TextExtractor()
+            tail = ""  # Trailing partial word, held back until more text arrives
+            started = False
+            
+            for raw in response.iter_content(chunk_size=chunk_size):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(_response_encoding(response, raw))(errors="replace")
+                parser.feed(decoder.decode(raw))
+                text = tail + parser.drain()
+                words = text.split()
+                tail = words.pop() if words and not text[-1].isspace() else ""
+                if words:
+                    yield (" " if started else "") + " ".join(words)
+                    started = True
+            
+            if decoder is not None:
+                parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+            words = (tail + parser.drain()).split()
+            if words:
+                yield (" " if started else "") + " ".join(words)
+    
     def get_html_from_markdown(self, file_path):
         """Get HTML content from a markdown file for link extraction."""
         if not os.path.exists(file_path):
@@ -150,39 +284,33 @@ class SimpleDocProcessor:
             return None
             
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                markdown_content = file.read()
-            
             # Convert markdown to HTML
-            html_content = markdown2.markdown(markdown_content)
+            html_content = _markdown_html(file_path)
             return f"<html><body>{html_content}</body></html>"
         except Exception as e:
             print(f"Error processing markdown file {file_path}: {e}")
             return None
     
-    def get_html_from_url(self, url):
-        """Get HTML content from a URL for link extraction."""
+    def fetch_html(self, url):
+        """Fetch the HTML of a URL, or None if it cannot be fetched."""
+        # SECURITY WARNING: Potential SSRF risk if `url` is untrusted (see process_url).
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                return response.text
-            else:
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
                 print(f"Failed to fetch URL: {url} with status code: {response.status_code}")
                 return None
+            response.encoding = _response_encoding(response, response.content[:4096])
+            return response.text
         except Exception as e:
             print(f"Error fetching URL {url}: {e}")
             return None
     
     def process_document(self, file_path_or_url):
         """Process a document based on its type (file or URL)."""
-        if file_path_or_url.startswith('http://') or file_path_or_url.startswith('https://'):
+        if file_path_or_url.startswith(('http://', 'https://')):
             return self.process_url(file_path_or_url)
-        elif file_path_or_url.endswith('.pdf'):
-            return self.process_pdf_file(file_path_or_url)
-        elif file_path_or_url.endswith('.md'):
-            return self.process_markdown_file(file_path_or_url)
-        elif file_path_or_url.endswith('.txt'):
-            return self.process_text_file(file_path_or_url)
-        else:
+        handler = self.EXTENSION_HANDLERS.get(os.path.splitext(file_path_or_url)[1].lower())
+        if handler is None:
             print(f"Unsupported file type or URL: {file_path_or_url}")
-            return None 
\ No newline at end of file
+            return None
+        return getattr(self, handler)(file_path_or_url) 
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Shared pytest fixtures, created once per test session.
+"""
+
+import pytest
+from simple_crawler import SimpleCrawler
+
+@pytest.fixture(scope="session")
+def crawler():
+    """Crawler shared by all tests, so its session and robots.txt cache are reused."""
+    return SimpleCrawler()
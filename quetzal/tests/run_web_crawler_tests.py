@@ -1,7 +1,9 @@
 import unittest
 import sys
 import os
+import io
 import traceback
+from pathlib import Path
 
 # Print diagnostic information
 print(f"Python executable: {sys.executable}")
@@ -73,19 +75,21 @@ try:
 
     if __name__ == "__main__":
         print("Starting web crawler tests...")
-        with open("web_crawler_test_results.txt", "w") as f:
-            # Save the original stdout
-            original_stdout = sys.stdout
-            # Redirect stdout to file
-            sys.stdout = f
-            try:
-                result = run_tests()
-            except Exception as e:
-                print(f"Exception during test execution: {e}")
-                traceback.print_exc(file=f)
-            finally:
-                # Restore stdout
-                sys.stdout = original_stdout
+        # Collect the output in memory and write the results file once at the end
+        buffer = io.StringIO()
+        # Save the original stdout
+        original_stdout = sys.stdout
+        # Redirect stdout to the buffer
+        sys.stdout = buffer
+        try:
+            result = run_tests()
+        except Exception as e:
+            print(f"Exception during test execution: {e}")
+            traceback.print_exc(file=buffer)
+        finally:
+            # Restore stdout
+            sys.stdout = original_stdout
+            Path("web_crawler_test_results.txt").write_text(buffer.getvalue())
         
         print("Web crawler tests completed. Check web_crawler_test_results.txt for details.")
 except Exception as e:
@@ -0,0 +1,46 @@
+"""
+Tests for the on-disk crawl store.
+"""
+
+import os
+import tempfile
+import unittest
+from crawl_store import CrawlStore
+
+class CrawlStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "crawl", "pages.db")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_pages_read_back_in_crawl_order(self):
+        store = CrawlStore(self.path)
+        store.add("https://example.com/", "Home", ["https://example.com/a", "https://example.com/b"])
+        store.add("https://example.com/a", "Page A", [])
+        store.add("https://example.com/", "Home, updated", [])
+
+        self.assertEqual(list(store.items()), [
+            ("https://example.com/", "Home, updated"),
+            ("https://example.com/a", "Page A")
+        ])
+        self.assertEqual(store.get_page("https://example.com/a"), ("Page A", []))
+        self.assertIsNone(store.get_page("https://example.com/missing"))
+        self.assertNotIn("https://example.com/missing", store)
+        with self.assertRaises(KeyError):
+            store["https://example.com/missing"]
+        store.close()
+
+    def test_pages_survive_reopening(self):
+        store = CrawlStore(self.path)
+        store.add("https://example.com/", "Home", ["https://example.com/a"])
+        store.close()
+
+        store = CrawlStore(self.path)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.get_page("https://example.com/"), ("Home", ["https://example.com/a"]))
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
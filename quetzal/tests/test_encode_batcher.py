@@ -0,0 +1,44 @@
+"""
+Tests for embedding request batching.
+"""
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from encode_batcher import EncodeBatcher
+
+class EncodeBatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def fake_encode(self, texts):
+        self.calls.append(list(texts))
+        self.started.set()
+        self.release.wait(5)
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+    def test_concurrent_requests_share_a_call(self):
+        batcher = EncodeBatcher(self.fake_encode)
+        first = batcher.submit(["a"])  # Occupies the worker until released
+        self.started.wait(5)
+        rest = [batcher.submit(["bb", "ccc"]), batcher.submit(["dddd"])]
+        self.release.set()
+
+        np.testing.assert_array_equal(first.result(5), [[1, 0]])
+        np.testing.assert_array_equal(rest[0].result(5), [[2, 0], [3, 1]])
+        np.testing.assert_array_equal(rest[1].result(5), [[4, 2]])
+        self.assertEqual(self.calls, [["a"], ["bb", "ccc", "dddd"]])
+
+    def test_errors_reach_every_request_of_the_call(self):
+        def failing_encode(texts):
+            raise RuntimeError("model failed")
+        batcher = EncodeBatcher(failing_encode)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda texts: batcher.submit(texts).exception(5), [["a"], ["b"]]))
+        self.assertTrue(all(isinstance(error, RuntimeError) for error in results))
+
+if __name__ == "__main__":
+    unittest.main()
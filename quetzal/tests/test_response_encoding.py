@@ -0,0 +1,28 @@
+"""
+Tests for picking the encoding of fetched pages.
+"""
+
+import unittest
+from types import SimpleNamespace
+from simple_doc_processor import _response_encoding
+
+def fake_response(content_type):
+    # requests reports ISO-8859-1 for text/* responses without a charset
+    encoding = content_type.split("charset=")[1] if "charset=" in content_type else "ISO-8859-1"
+    return SimpleNamespace(headers={"Content-Type": content_type}, encoding=encoding)
+
+class ResponseEncodingTest(unittest.TestCase):
+    def test_header_charset_wins(self):
+        response = fake_response("text/html; charset=windows-1252")
+        self.assertEqual(_response_encoding(response, b'<meta charset="utf-8">'), "windows-1252")
+
+    def test_meta_charset_used_without_header_charset(self):
+        head = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">'
+        self.assertEqual(_response_encoding(fake_response("text/html"), head), "shift_jis")
+
+    def test_utf8_without_any_charset(self):
+        self.assertEqual(_response_encoding(fake_response("text/html"), "<p>café</p>".encode()), "utf-8")
+        self.assertEqual(_response_encoding(fake_response("text/html"), b'<meta charset="bogus">'), "utf-8")
+
+if __name__ == "__main__":
+    unittest.main()
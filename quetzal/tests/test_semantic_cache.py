@@ -0,0 +1,72 @@
+"""
+Tests for the semantic answer cache.
+"""
+
+import unittest
+import numpy as np
+from semantic_cache import SemanticCache, _MatrixIndex, hnswlib
+
+class SemanticCacheTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = [rng.normal(size=16) for _ in range(4)]
+
+    def check_backend(self, use_hnsw):
+        cache = SemanticCache(threshold=0.9, ttl=60, max_entries=2, use_hnsw=use_hnsw)
+        for i, vec in enumerate(self.vectors[:3]):
+            cache.store(vec, {"answer": i}, scope="folder")
+
+        # Near-duplicate query hits, other scopes and unrelated queries miss
+        self.assertEqual(cache.lookup(self.vectors[2] + 0.01, "folder"), {"answer": 2})
+        self.assertIsNone(cache.lookup(self.vectors[2], "other"))
+        self.assertIsNone(cache.lookup(self.vectors[3], "folder"))
+
+        # The oldest entry was evicted to respect max_entries
+        self.assertIsNone(cache.lookup(self.vectors[0], "folder"))
+
+        cache.clear()
+        self.assertIsNone(cache.lookup(self.vectors[2], "folder"))
+
+    def test_matrix_backend(self):
+        self.check_backend(use_hnsw=False)
+
+    @unittest.skipIf(hnswlib is None, "hnswlib is not installed")
+    def test_hnsw_backend(self):
+        self.check_backend(use_hnsw=True)
+
+    def test_lookups_keep_entries_from_eviction(self):
+        cache = SemanticCache(threshold=0.9, ttl=60, max_entries=2, use_hnsw=False)
+        cache.store(self.vectors[0], {"answer": 0})
+        cache.store(self.vectors[1], {"answer": 1})
+        cache.lookup(self.vectors[0])
+        cache.store(self.vectors[2], {"answer": 2})
+        self.assertEqual(cache.lookup(self.vectors[0]), {"answer": 0})
+        self.assertIsNone(cache.lookup(self.vectors[1]))
+
+    def test_matrix_index_survives_growth_and_removal(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(100, 8)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index = _MatrixIndex(8, max_elements=4)
+        for label, vec in enumerate(vectors):
+            index.add(label, vec)
+        for label in range(0, 100, 3):
+            index.remove(label)
+        for label in range(1, 100, 3):
+            self.assertEqual(index.nearest(vectors[label])[0], label)
+        self.assertEqual(index.count, 66)
+
+    def test_expired_entries_are_not_served(self):
+        cache = SemanticCache(threshold=0.9, ttl=0, use_hnsw=False)
+        cache.store(self.vectors[0], {"answer": 0})
+        self.assertIsNone(cache.lookup(self.vectors[0]))
+
+    def test_restored_entries_keep_their_age(self):
+        cache = SemanticCache(threshold=0.9, ttl=60, use_hnsw=False)
+        cache.store(self.vectors[0], {"answer": 0}, age=30)
+        cache.store(self.vectors[1], {"answer": 1}, age=60)
+        self.assertEqual(cache.lookup(self.vectors[0]), {"answer": 0})
+        self.assertIsNone(cache.lookup(self.vectors[1]))
+
+if __name__ == "__main__":
+    unittest.main()
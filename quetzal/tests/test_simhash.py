@@ -0,0 +1,32 @@
+"""
+Tests for SimHash document fingerprints.
+"""
+
+import random
+import unittest
+from simhash import SimHash, simhash, hamming_distance
+
+class SimHashTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        vocabulary = [f"word{i}" for i in range(2000)]
+        self.text = " ".join(rng.choice(vocabulary) for _ in range(3000))
+        self.other_text = " ".join(rng.choice(vocabulary) for _ in range(3000))
+
+    def test_streamed_pieces_match_whole_text(self):
+        hasher = SimHash()
+        for start in range(0, len(self.text), 37):
+            hasher.update(self.text[start:start + 37])
+        self.assertEqual(hasher.digest(), simhash(self.text))
+
+    def test_small_edits_stay_close(self):
+        edited = self.text.replace("word1 ", "typo ", 1) + " One more sentence."
+        self.assertLessEqual(hamming_distance(simhash(self.text), simhash(edited)), 3)
+        self.assertGreater(hamming_distance(simhash(self.text), simhash(self.other_text)), 3)
+
+    def test_case_and_punctuation_are_ignored(self):
+        self.assertEqual(simhash("Hello, World"), simhash("hello world"))
+        self.assertEqual(simhash(""), 0)
+
+if __name__ == "__main__":
+    unittest.main()
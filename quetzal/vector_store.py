@@ -1,36 +1,122 @@
 import uuid
 import os
+import random
 import time
-from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+import functools
+import importlib.util
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from sentence_transformers import SentenceTransformer, __version__ as SENTENCE_TRANSFORMERS_VERSION
 import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.init import AdditionalConfig, Timeout
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
 from weaviate.collections.classes.config import Configure, DataType
+from config.config import DOCUMENT_PROCESSOR_CONFIG, EMBEDDING_CONFIG
+from encode_batcher import EncodeBatcher
+
+# Properties fetched for and returned with each search hit
+_RESULT_FIELDS = ("content", "source", "title", "document_id", "folder_id")
+
+@functools.lru_cache(maxsize=None)
+def _load_model(name: str) -> SentenceTransformer:
+    """Load a sentence transformer once per process, sharing it between vector stores."""
+    if EMBEDDING_CONFIG["backend"] == "onnx":
+        if (tuple(int(part) for part in SENTENCE_TRANSFORMERS_VERSION.split(".")[:2]) < (3, 2)
+                or importlib.util.find_spec("onnxruntime") is None or importlib.util.find_spec("optimum") is None):
+            raise ValueError(
+                f'EMBEDDING_CONFIG["backend"] = "onnx" needs sentence-transformers>=3.2 with the optional onnx extra '
+                f'(pip install "sentence-transformers[onnx]>=3.2"), found sentence-transformers {SENTENCE_TRANSFORMERS_VERSION}'
+            )
+        # ONNX Runtime runs the fused (and optionally int8-quantized) graph, several times faster on CPUs
+        model_kwargs = {"file_name": EMBEDDING_CONFIG["onnx_file_name"]} if EMBEDDING_CONFIG["onnx_file_name"] else None
+        return SentenceTransformer(name, backend="onnx", model_kwargs=model_kwargs)
+    
+    model = SentenceTransformer(name)
+    if EMBEDDING_CONFIG["half_precision_on_gpu"] and model.device.type == "cuda":
+        model.half()  # Halves encoder memory and bandwidth; CPUs keep FP32
+    return model
 
 class WeaviateError(Exception):
     """Custom exception for Weaviate errors."""
     pass
 
+def iter_chunks(pieces: Iterable[str], chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    """
+    Split a stream of text into overlapping chunks, preferring to break on whitespace.
+    
+    Chunks are yielded as soon as enough text has arrived, so only about one
+    chunk of text is buffered at a time.
+    
+    Args:
+        pieces: Consecutive pieces of the text
+        chunk_size: Maximum chunk length (in characters)
+        chunk_overlap: Number of characters shared by consecutive chunks
+        
+    Yields:
+        Chunks of the text
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) > chunk_size:
+            end = chunk_size
+            # Avoid cutting a word in half when a space is available
+            space = buffer.rfind(" ", chunk_overlap + 1, end)
+            if space != -1:
+                end = space
+            yield buffer[:end]
+            buffer = buffer[max(end - chunk_overlap, 1):]
+    yield buffer
+
+def chunk_text(content: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring to break on whitespace.
+    
+    Args:
+        content: Text to split
+        chunk_size: Maximum chunk length (in characters)
+        chunk_overlap: Number of characters shared by consecutive chunks
+        
+    Returns:
+        List of chunks
+    """
+    return list(iter_chunks([content], chunk_size, chunk_overlap))
+
 class VectorStore:
     """Integration with Weaviate vector database."""
     
-    def __init__(self, api_key: Optional[str] = None, cloud_url: Optional[str] = None):
+    # Endpoints whose Document collection is known to exist, shared by all stores in the process
+    _SCHEMA_READY: Set[str] = set()
+    
+    def __init__(self, api_key: Optional[str] = None, cloud_url: Optional[str] = None, model: Optional[SentenceTransformer] = None):
         """
         Initialize the Weaviate client.
         
         Args:
             api_key: Weaviate API key
             cloud_url: Weaviate Cloud URL
+            model: Embedding model to use (the configured model, shared by all stores, if not provided)
             
         Raises:
             WeaviateError: If client initialization fails
         """
         try:
-            # Initialize the sentence transformer model
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            # Initialize the sentence transformer model (loaded once per process)
+            self.model = model if model is not None else _load_model(EMBEDDING_CONFIG["model"])
+            
+            # Run all encoding on one worker thread, merging concurrent requests into shared forward passes
+            self._encoder = EncodeBatcher(self._encode)
+            
+            # Memoize query embeddings so repeated queries skip the encoder
+            self._cached_query_embedding = functools.lru_cache(maxsize=2048)(self._encode_query)
+            # Queries differing only in case embed identically with an uncased tokenizer
+            self._lowercase_queries = bool(getattr(getattr(self.model, "tokenizer", None), "do_lower_case", False))
             
             # Initialize Weaviate client with retry mechanism
+            # Health checks are skipped unless WEAVIATE_SKIP_INIT_CHECKS is "0"/"false", so unreachable instances can fail fast
+            skip_init_checks = os.environ.get("WEAVIATE_SKIP_INIT_CHECKS", "true").lower() not in ("0", "false", "no")
             self.client = None
             max_retries = 3
             retry_count = 0
@@ -46,15 +132,17 @@ class VectorStore:
                             additional_config=AdditionalConfig(
                                 timeout=Timeout(init=60, query=60, insert=120)
                             ),
-                            skip_init_checks=True  # Skip gRPC health checks to avoid connection issues
+                            skip_init_checks=skip_init_checks  # Skipping gRPC health checks avoids connection issues
                         )
+                        self._endpoint = cloud_url
                         print(f"Connected to Weaviate Cloud at {cloud_url}")
                     else:
                         # Local connection (fallback)
                         print("No cloud URL provided, connecting to local Weaviate instance")
                         self.client = weaviate.connect_to_local(
-                            skip_init_checks=True
+                            skip_init_checks=skip_init_checks
                         )
+                        self._endpoint = "local"
                         print("Connected to local Weaviate instance")
                 except Exception as e:
                     retry_count += 1
@@ -65,8 +153,9 @@ class VectorStore:
                         print("Cloud connection failed, attempting local fallback connection")
                         try:
                             self.client = weaviate.connect_to_local(
-                                skip_init_checks=True
+                                skip_init_checks=skip_init_checks
                             )
+                            self._endpoint = "local"
                             print("Connected to local Weaviate instance as fallback")
                         except Exception as local_e:
                             print(f"Local fallback connection also failed: {str(local_e)}")
@@ -74,13 +163,17 @@ class VectorStore:
                     
                     # Wait before retrying
                     if retry_count < max_retries and self.client is None:
-                        time.sleep(2)  # 2 second delay between retries
+                        # Exponential backoff with jitter: retry a transient failure almost at once
+                        time.sleep(min(0.1 * 2 ** retry_count, 2.0) + random.uniform(0, 0.05))
             
             if self.client is None:
                 raise WeaviateError("Failed to initialize Weaviate client after retries")
                 
             # Create schema if it doesn't exist
             self._create_schema()
+            
+            # Handle to the Document collection, reused by every operation
+            self._collection = self.client.collections.get("Document")
         except Exception as e:
             # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
             # RECOMMENDATION: Log full error `e` server-side. Raise generic error or sanitize `str(e)`.
@@ -88,109 +181,289 @@ class VectorStore:
     
     def _create_schema(self):
         """Create the document schema if it doesn't exist."""
+        if self._endpoint in self._SCHEMA_READY:
+            # Another store in this process already checked (or created) the collection
+            return
+        
         try:
-            # Check if collection exists
-            try:
-                # Try to get the collection by name
-                collection = self.client.collections.get("Document")
+            # Check if collection exists (collections.get is lazy and never fails for a missing collection)
+            if self.client.collections.exists("Document"):
                 print("Document collection exists in schema.")
+                self._SCHEMA_READY.add(self._endpoint)
                 return
-            except Exception as e:
-                print(f"Document collection doesn't exist. Creating it: {str(e)}")
-                
-                # Create the collection using Weaviate's builder pattern
-                collection = self.client.collections.create(
-                    name="Document",
-                    vectorizer_config=Configure.Vectorizer.none(),
-                    properties=[
-                        {
-                            "name": "content",
-                            "data_type": [DataType.TEXT],
-                            "description": "The document content"
-                        },
-                        {
-                            "name": "source",
-                            "data_type": [DataType.TEXT],
-                            "description": "Source of the document (file path or URL)"
-                        },
-                        {
-                            "name": "title",
-                            "data_type": [DataType.TEXT],
-                            "description": "Title of the document"
-                        },
-                        {
-                            "name": "document_id",
-                            "data_type": [DataType.TEXT],
-                            "description": "Reference to external document ID"
-                        },
-                        {
-                            "name": "folder_id",
-                            "data_type": [DataType.TEXT],
-                            "description": "Reference to folder ID"
-                        }
-                    ]
-                )
-                print("Document collection created successfully.")
+            
+            print("Document collection doesn't exist. Creating it.")
+            
+            # Create the collection using Weaviate's builder pattern
+            collection = self.client.collections.create(
+                name="Document",
+                vectorizer_config=Configure.Vectorizer.none(),
+                vector_index_config=self._vector_index_config(),
+                properties=[
+                    {
+                        "name": "content",
+                        "data_type": [DataType.TEXT],
+                        "description": "The document content"
+                    },
+                    {
+                        "name": "source",
+                        "data_type": [DataType.TEXT],
+                        "description": "Source of the document (file path or URL)"
+                    },
+                    {
+                        "name": "title",
+                        "data_type": [DataType.TEXT],
+                        "description": "Title of the document"
+                    },
+                    {
+                        "name": "document_id",
+                        "data_type": [DataType.TEXT],
+                        "description": "Reference to external document ID"
+                    },
+                    {
+                        "name": "folder_id",
+                        "data_type": [DataType.TEXT],
+                        "description": "Reference to folder ID"
+                    }
+                ]
+            )
+            print("Document collection created successfully.")
+            self._SCHEMA_READY.add(self._endpoint)
                 
         except Exception as e:
             # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
             raise WeaviateError(f"Failed to create schema: {str(e)}") # Placeholder: Original code left
     
-    def add_document(self, content: str, source: str, title: str, document_id: Optional[str] = None, folder_id: Optional[str] = None) -> List[str]:
+    @staticmethod
+    def _vector_index_config():
+        """Build the HNSW index configuration, compressing vectors with the configured quantizer."""
+        quantizers = {
+            "sq": Configure.VectorIndex.Quantizer.sq,  # 8 bits per dimension, rescored with full vectors
+            "pq": Configure.VectorIndex.Quantizer.pq,
+            "bq": Configure.VectorIndex.Quantizer.bq  # 1 bit per dimension, rescored with full vectors
+        }
+        quantizer = EMBEDDING_CONFIG["vector_quantizer"]
+        if quantizer is None:
+            return Configure.VectorIndex.hnsw()
+        return Configure.VectorIndex.hnsw(quantizer=quantizers[quantizer]())
+    
+    def add_document(self, content: str, source: str, title: str, document_id: Optional[str] = None, folder_id: Optional[str] = None, batch_size: int = 200) -> List[str]:
         """
         Add a document to the vector store.
         
+        The content is split into chunks which are embedded and inserted
+        batch_size objects at a time.
+        
         Args:
             content: Document content
             source: Source of the document
             title: Title of the document
             document_id: Optional reference to external document ID
             folder_id: Optional reference to folder ID
+            batch_size: Number of chunks sent to Weaviate per insert request
             
         Returns:
-            List of document IDs
+            List of chunk IDs
             
         Raises:
             WeaviateError: If document addition fails
         """
-        try:
-            # Generate document ID
-            vec_id = str(uuid.uuid4())
+        return self.add_document_stream([content], source, title, document_id, folder_id, batch_size)
+    
+    def add_document_stream(self, pieces: Iterable[str], source: str, title: str, document_id: Optional[str] = None, folder_id: Optional[str] = None, batch_size: int = 200) -> List[str]:
+        """
+        Add a document whose content arrives as a stream of text pieces.
+        
+        Chunks are cut as the text arrives. Each full batch is embedded and
+        inserted on a worker thread while the next batch is being read, so
+        e.g. a page download overlaps with embedding.
+        
+        Args:
+            pieces: Consecutive pieces of the document content
+            source: Source of the document
+            title: Title of the document
+            document_id: Optional reference to external document ID
+            folder_id: Optional reference to folder ID
+            batch_size: Number of chunks sent to Weaviate per insert request
             
-            # Generate embedding
-            embedding = self.model.encode(content).tolist()
+        Returns:
+            List of chunk IDs
             
-            # Prepare document data
+        Raises:
+            WeaviateError: If document addition fails
+        """
+        try:
+            # Prepare shared document metadata
             # SECURITY NOTE: Sensitive data (potentially in `content`, `source`, `title`) is stored in Weaviate.
             # Ensure appropriate access controls are configured on the Weaviate instance itself
             # and that application-level authorization prevents unauthorized data access/modification.
-            doc_data = {
-                "content": content,
+            metadata = {
                 "source": source,
                 "title": title
             }
             
             # Add optional document ID reference if provided
             if document_id:
-                doc_data["document_id"] = document_id
+                metadata["document_id"] = document_id
                 
             # Add optional folder ID reference if provided
             if folder_id:
-                doc_data["folder_id"] = folder_id
-            
-            # Add document to Weaviate
-            collection = self.client.collections.get("Document")
-            collection.data.insert(
-                properties=doc_data,
-                vector=embedding,
-                uuid=vec_id
-            )
+                metadata["folder_id"] = folder_id
+            
+            collection = self._collection
+            vec_ids = []
+            batch = []
+            pending = None
             
-            return [vec_id]
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                chunks = iter_chunks(
+                    pieces,
+                    DOCUMENT_PROCESSOR_CONFIG["chunk_size"],
+                    DOCUMENT_PROCESSOR_CONFIG["chunk_overlap"]
+                )
+                for chunk in chunks:
+                    if not chunk:
+                        continue  # Nothing to store for an empty document
+                    batch.append(chunk)
+                    if len(batch) < batch_size:
+                        continue
+                    
+                    # Keep at most one batch in flight so memory stays bounded
+                    if pending is not None:
+                        vec_ids.extend(pending.result())
+                    pending = executor.submit(self._insert_batch, collection, batch, [metadata] * len(batch))
+                    batch = []
+                
+                if pending is not None:
+                    vec_ids.extend(pending.result())
+                if batch:
+                    vec_ids.extend(self._insert_batch(collection, batch, [metadata] * len(batch)))
+            
+            return vec_ids
         except Exception as e:
             # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
             raise WeaviateError(f"Failed to add document: {str(e)}") # Placeholder: Original code left
     
+    def add_documents_batch(self, documents: List[Dict[str, Any]], batch_size: int = 100) -> List[List[str]]:
+        """
+        Add several documents to the vector store at once.
+        
+        Chunks of all documents are pooled, so small documents share embedding
+        calls and insert requests instead of costing two round trips each.
+        
+        Args:
+            documents: Documents with "content", "source" and "title" keys and
+                optional "document_id" and "folder_id" keys
+            batch_size: Number of chunks sent to Weaviate per insert request
+            
+        Returns:
+            List of chunk IDs for each document, in input order
+            
+        Raises:
+            WeaviateError: If document addition fails
+        """
+        try:
+            chunks = []
+            chunk_metadata = []
+            owners = []  # Index of the document each chunk belongs to
+            for i, document in enumerate(documents):
+                metadata = {"source": document["source"], "title": document["title"]}
+                for key in ("document_id", "folder_id"):
+                    if document.get(key):
+                        metadata[key] = document[key]
+                
+                for chunk in chunk_text(
+                    document["content"],
+                    DOCUMENT_PROCESSOR_CONFIG["chunk_size"],
+                    DOCUMENT_PROCESSOR_CONFIG["chunk_overlap"]
+                ):
+                    chunks.append(chunk)
+                    chunk_metadata.append(metadata)
+                    owners.append(i)
+            
+            collection = self._collection
+            vec_ids = [[] for _ in documents]
+            
+            def collect(start, future):
+                for owner, vec_id in zip(owners[start:start + batch_size], future.result()):
+                    vec_ids[owner].append(vec_id)
+            
+            # Embed the next batch while the previous insert request is in flight
+            pending = None
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                for start in range(0, len(chunks), batch_size):
+                    end = start + batch_size
+                    objects = self._embed_batch(chunks[start:end], chunk_metadata[start:end])
+                    if pending is not None:
+                        collect(*pending)
+                    pending = (start, executor.submit(self._insert_objects, collection, objects))
+                if pending is not None:
+                    collect(*pending)
+            
+            return vec_ids
+        except Exception as e:
+            # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
+            raise WeaviateError(f"Failed to add documents: {str(e)}") # Placeholder: Original code left
+    
+    def _insert_batch(self, collection, chunks: List[str], metadata: List[Dict[str, Any]]) -> List[str]:
+        """Embed a batch of chunks and insert them with a single request, returning their IDs."""
+        return self._insert_objects(collection, self._embed_batch(chunks, metadata))
+    
+    def _embed_batch(self, chunks: List[str], metadata: List[Dict[str, Any]]) -> List[DataObject]:
+        """Embed a batch of chunks into Weaviate data objects with fresh IDs."""
+        embeddings = self._encoder.encode(chunks)
+        return [
+            DataObject(
+                properties={"content": chunk, **chunk_metadata},
+                vector=embedding.tolist(),
+                uuid=uuid.uuid4().hex
+            )
+            for chunk, chunk_metadata, embedding in zip(chunks, metadata, embeddings)
+        ]
+    
+    def _insert_objects(self, collection, objects: List[DataObject]) -> List[str]:
+        """Insert embedded objects with a single request, returning their IDs."""
+        result = collection.data.insert_many(objects)
+        if result.has_errors:
+            first_error = next(iter(result.errors.values()))
+            raise WeaviateError(f"{len(result.errors)} of {len(objects)} chunks were rejected, e.g.: {first_error.message}")
+        return [obj.uuid for obj in objects]
+    
+    def _encode(self, texts: List[str]):
+        """Embed texts with the model; called on the encoder thread only."""
+        # The model runs the texts in passes of encode_batch_size
+        return self.model.encode(
+            texts,
+            batch_size=EMBEDDING_CONFIG["encode_batch_size"],
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True  # Unit vectors keep cosine distance accurate under quantization
+        )
+    
+    def _encode_query(self, query: str) -> tuple:
+        """Encode a query into a hashable tuple so the result can be memoized."""
+        return tuple(self._encoder.encode([query])[0].tolist())
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Generate the embedding used to search for a query.
+        
+        Repeated queries are served from an in-memory LRU cache. Queries are
+        keyed with whitespace collapsed (and lowercased for uncased models),
+        which the tokenizer would discard anyway, so trivial variants share
+        an entry.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding
+        """
+        key = " ".join(query.split())
+        if self._lowercase_queries:
+            key = key.lower()
+        return list(self._cached_query_embedding(key))
+    
     def search(self, query: str, search_type: str = "hybrid", limit: int = 5, document_id: Optional[str] = None, folder_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Search for relevant documents using various search strategies.
@@ -209,31 +482,18 @@ class VectorStore:
             WeaviateError: If search fails
         """
         try:
-            # Make sure Document collection exists
-            try:
-                collection = self.client.collections.get("Document")
-            except Exception as e:
-                print(f"Error accessing Document collection: {str(e)}")
-                self._create_schema()
-                collection = self.client.collections.get("Document")
+            collection = self._collection
             
             # Generate query embedding
-            query_embedding = self.model.encode(query).tolist()
+            query_embedding = self.embed_query(query)
             
             # Set up optional document filtering
+            # Typed filters are evaluated server-side and sent over gRPC
             where_filter = None
             if document_id:
-                where_filter = {
-                    "path": ["document_id"],
-                    "operator": "Equal",
-                    "valueText": document_id # SECURITY NOTE: Ensure `document_id` is validated if user-controlled to prevent filter injection.
-                }
+                where_filter = Filter.by_property("document_id").equal(document_id) # SECURITY NOTE: Ensure `document_id` is validated if user-controlled.
             elif folder_id:
-                where_filter = {
-                    "path": ["folder_id"],
-                    "operator": "Equal",
-                    "valueText": folder_id # SECURITY NOTE: Ensure `folder_id` is validated if user-controlled to prevent filter injection.
-                }
+                where_filter = Filter.by_property("folder_id").equal(folder_id) # SECURITY NOTE: Ensure `folder_id` is validated if user-controlled.
                 
             results = None
             documents = []
@@ -244,7 +504,8 @@ class VectorStore:
                 results = collection.query.near_vector(
                     near_vector=query_embedding,
                     limit=limit,
-                    filters=where_filter
+                    filters=where_filter,
+                    return_properties=_RESULT_FIELDS
                 )
             
             elif search_type == "keyword":
@@ -252,7 +513,8 @@ class VectorStore:
                 results = collection.query.bm25(
                     query=query,
                     limit=limit,
-                    filters=where_filter
+                    filters=where_filter,
+                    return_properties=_RESULT_FIELDS
                 )
                 
             elif search_type == "hybrid":
@@ -264,7 +526,8 @@ class VectorStore:
                     vector=query_embedding,
                     alpha=0.5,  # Balance between vector (alpha) and keyword (1-alpha)
                     limit=limit,
-                    filters=where_filter
+                    filters=where_filter,
+                    return_properties=_RESULT_FIELDS
                 )
             
             else:
@@ -272,15 +535,10 @@ class VectorStore:
             
             # Format results
             if hasattr(results, 'objects'):
-                for obj in results.objects:
-                    doc = {
-                        "content": obj.properties.get("content", ""),
-                        "source": obj.properties.get("source", ""),
-                        "title": obj.properties.get("title", ""),
-                        "document_id": obj.properties.get("document_id", ""),
-                        "folder_id": obj.properties.get("folder_id", "")
-                    }
-                    documents.append(doc)
+                documents = [
+                    {field: obj.properties.get(field, "") for field in _RESULT_FIELDS}
+                    for obj in results.objects
+                ]
             
             return documents
         except Exception as e:
@@ -302,7 +560,7 @@ class VectorStore:
         """
         # SECURITY NOTE: Ensure calling code performs authorization checks before allowing deletion.
         try:
-            collection = self.client.collections.get("Document")
+            collection = self._collection
             collection.data.delete(uuid=doc_id)
             return True
         except Exception as e:
@@ -325,13 +583,8 @@ class VectorStore:
         # SECURITY NOTE: Ensure calling code performs authorization checks before allowing deletion.
         # Also ensure `document_id` is validated if user-controlled.
         try:
-            collection = self.client.collections.get("Document")
-            where_filter = {
-                "path": ["document_id"],
-                "operator": "Equal",
-                "valueText": document_id
-            }
-            result = collection.data.delete_many(where=where_filter)
+            collection = self._collection
+            collection.data.delete_many(where=Filter.by_property("document_id").equal(document_id))
             return True
         except Exception as e:
             # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
@@ -350,8 +603,12 @@ class VectorStore:
         # SECURITY NOTE: Ensure calling code performs authorization checks before allowing deletion.
         # This is a destructive operation.
         try:
-            collection = self.client.collections.get("Document")
-            collection.data.delete_many()
+            # Drop and recreate the collection: one server-side operation, where delete_many
+            # needs a filter and removes a limited number of objects per call
+            self._SCHEMA_READY.discard(self._endpoint)
+            self.client.collections.delete("Document")
+            self._create_schema()
+            self._collection = self.client.collections.get("Document")
             return True
         except Exception as e:
             # SECURITY WARNING: Propagating raw exception messages (`str(e)`) can leak sensitive details.
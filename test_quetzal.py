@@ -1,22 +1,68 @@
 import requests
+from requests.adapters import HTTPAdapter
+import atexit
+import functools
 import json
+import random
 import time
 import os
 import sys
 
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library encoder
+    orjson = None
+
 BASE_URL = "http://127.0.0.1:5000"
-MAX_RETRIES = 5
-RETRY_DELAY = 2  # seconds
+# Pages ingested by the URL processing test; all are queued before any is waited on
+TEST_URLS = ["https://docs.scrapy.org/en/latest/#"]
+MAX_RETRIES = 8
+# Retry delays in seconds: exponential backoff with full jitter, from BACKOFF_BASE up to BACKOFF_CAP
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 8.0
+
+# One session for every request, so the connection to the app is kept alive between calls
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+atexit.register(SESSION.close)
+# Seconds to wait for a connection (so a dead app is detected quickly) and for each read of the response
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 60.0
+
+def _request(method, path, *, json=None, files=None, data=None, params=None, timeout=READ_TIMEOUT, connect_timeout=CONNECT_TIMEOUT):
+    """
+    Call the app and return its JSON response.
+    
+    HTTP error statuses are returned as {"success": False, "error": ..., "status_code": ...}
+    and bodies that are not a JSON object as {"success": False, "error": ...}, instead of
+    raising; connection errors still raise requests.exceptions.RequestException.
+    """
+    response = SESSION.request(
+        method, f"{BASE_URL}{path}",
+        json=json, files=files, data=data, params=params,
+        timeout=(connect_timeout, timeout)
+    )
+    if not response.ok:
+        return {"success": False, "error": f"HTTP {response.status_code}: {response.text[:200]}", "status_code": response.status_code}
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return {"success": False, "error": f"Expected a JSON object, got: {response.text[:200]}"}
+    return body
 
 def test_application_running():
     """Test if the application is running and properly initialized."""
     print("Testing if application is running...")
     
     for attempt in range(MAX_RETRIES):
+        # Unless the app answers, back off as if it were still starting up
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
         try:
-            response = requests.get(f"{BASE_URL}/status", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
+            # /status answers from memory, so a slow connect or reply means the app is not up yet
+            data = _request("GET", "/status", timeout=5.0, connect_timeout=1.0)
+            if "status_code" not in data:
                 if data.get("assistant_initialized", False):
                     print("✅ Application is running and Research Assistant is properly initialized")
                     return True
@@ -24,14 +70,16 @@ def test_application_running():
                     print(f"❌ Application is running but Research Assistant failed to initialize: {data.get('error', 'Unknown error')}")
                     return False
             else:
-                print(f"Attempt {attempt+1}/{MAX_RETRIES}: Application responded with status code {response.status_code}")
+                print(f"Attempt {attempt+1}/{MAX_RETRIES}: Application responded with status code {data['status_code']}")
+                # The app is up (e.g. a 5xx while it finishes initializing), so check again soon without backing off
+                delay = BACKOFF_BASE
         except requests.exceptions.RequestException as e:
             print(f"Attempt {attempt+1}/{MAX_RETRIES}: Connection error: {e}")
         
         # Wait before retrying
         if attempt < MAX_RETRIES - 1:
-            print(f"Waiting {RETRY_DELAY} seconds before retry...")
-            time.sleep(RETRY_DELAY)
+            print(f"Waiting {delay:.2f} seconds before retry...")
+            time.sleep(delay)
     
     print("❌ Application is not running or not responding")
     return False
@@ -44,8 +92,7 @@ def process_url(url, folder_id=None):
     if folder_id:
         data["folder_id"] = folder_id
         
-    response = requests.post(f"{BASE_URL}/process-url", json=data, timeout=60)
-    return response.json()
+    return _request("POST", "/process-url", json=data)
 
 def upload_document(file_path, folder_id=None):
     """Upload a document to the application."""
@@ -55,16 +102,15 @@ def upload_document(file_path, folder_id=None):
         print(f"❌ File not found: {file_path}")
         return {"success": False, "error": "File not found"}
     
-    files = {"file": open(file_path, "rb")}
     data = {}
     if folder_id:
         data["folder_id"] = folder_id
         
-    response = requests.post(f"{BASE_URL}/upload-document", files=files, data=data, timeout=60)
-    return response.json()
+    with open(file_path, "rb") as file:
+        return _request("POST", "/upload-document", files={"file": file}, data=data)
 
 def ask_question(query, folder_id=None, chat_id=None):
-    """Ask a question to the research assistant."""
+    """Ask a question to the research assistant, returning the same fields as /query."""
     print(f"Asking question: {query[:50]}...")
     
     data = {"query": query}
@@ -73,13 +119,68 @@ def ask_question(query, folder_id=None, chat_id=None):
     if chat_id:
         data["chat_id"] = chat_id
         
-    response = requests.post(f"{BASE_URL}/query", json=data, timeout=60)
-    return response.json()
+    # Stream the answer as server-sent events, printing its text as it is generated
+    with SESSION.post(f"{BASE_URL}/query-stream", json=data, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True) as response:
+        if not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            # Rejected before streaming started, with a plain JSON error
+            return response.json()
+        
+        response.encoding = "utf-8"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "delta":
+                print(event["text"], end="", flush=True)
+            elif event["type"] == "done":
+                print()
+                return {
+                    "success": True,
+                    "answer": event["answer"],
+                    "sources": event.get("sources", []),
+                    "chat_id": event.get("chat_id"),
+                    "cache_hit": event.get("cache_hit", False)
+                }
+            elif event["type"] == "error":
+                return {"success": False, "error": event["error"]}
+    
+    return {"success": False, "error": "Answer stream ended without a result"}
+
+def wait_until_ready(job_id, max_wait=30):
+    """Poll an ingestion job until it is ready or failed, checking often at first and less often later."""
+    deadline = time.monotonic() + max_wait
+    interval = 0.2
+    while True:
+        status = _request("GET", "/job-status", params={"job_id": job_id}, timeout=5.0)
+        if not status.get("success", False) or status.get("status") != "pending":
+            return status
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {"success": False, "status": "pending", "error": f"Job still pending after {max_wait} seconds"}
+        # Jitter each wait, so concurrent pollers do not hit the app in lockstep
+        time.sleep(min(remaining, interval * random.uniform(0.5, 1.5)))
+        interval = min(interval * 2, 2.0)
+
+FOLDERS_TTL = 30  # seconds a fetched folder list is reused
+
+@functools.lru_cache(maxsize=1)
+def _get_folders_cached(ttl_bucket):
+    return _request("GET", "/get-folders")
 
 def get_folders():
-    """Get all folders from the application."""
-    response = requests.get(f"{BASE_URL}/get-folders")
-    return response.json()
+    """Get all folders from the application, reusing the last successful response for up to FOLDERS_TTL seconds."""
+    result = _get_folders_cached(int(time.time() // FOLDERS_TTL))
+    if "error" in result:
+        _get_folders_cached.cache_clear()  # Never reuse a failure; the next call asks the app again
+    return result
+
+def _pp(obj):
+    """Format a response dict as JSON, indented for a terminal and on one line when output is redirected."""
+    indent = sys.stdout.isatty()
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    return json.dumps(obj, indent=2 if indent else None)
 
 def run_test_plan():
     """Run the complete test plan according to the testing strategy."""
@@ -107,22 +208,20 @@ def run_test_plan():
     # Test 2: Process URL
     print("\n2. TESTING URL PROCESSING")
     print("-"*30)
-    scrapy_url = "https://docs.scrapy.org/en/latest/#"
-    result = process_url(scrapy_url, default_folder_id)
-    print("\nURL Processing Result:")
-    print(json.dumps(result, indent=2))
-    
-    if result.get("success", False):
-        print(f"✅ Successfully processed URL: {scrapy_url}")
-    else:
-        print(f"❌ Failed to process URL: {result.get('error', 'Unknown error')}")
-        if not result.get("success") and "assistant not initialized" in result.get("error", ""):
-            print("Cannot continue with testing - Research Assistant is not initialized")
-            return False
-    
-    # Wait a moment for processing to complete
-    print("Waiting 10 seconds for processing to complete...")
-    time.sleep(10)
+    jobs = []  # (name, response) of each queued ingestion
+    for url in TEST_URLS:
+        result = process_url(url, default_folder_id)
+        print("\nURL Processing Result:")
+        print(_pp(result))
+        
+        if result.get("success", False):
+            print(f"✅ Successfully processed URL: {url}")
+            jobs.append((url, result))
+        else:
+            print(f"❌ Failed to process URL: {result.get('error', 'Unknown error')}")
+            if "assistant not initialized" in result.get("error", ""):
+                print("Cannot continue with testing - Research Assistant is not initialized")
+                return False
     
     # Test 3: Upload document
     print("\n3. TESTING DOCUMENT UPLOAD")
@@ -130,16 +229,20 @@ def run_test_plan():
     doc_path = "SmartResearchAssistant/local docs/OpenAI Agents SDK Documentation on Agents.md"
     upload_result = upload_document(doc_path, default_folder_id)
     print("\nDocument Upload Result:")
-    print(json.dumps(upload_result, indent=2))
+    print(_pp(upload_result))
     
     if upload_result.get("success", False):
         print(f"✅ Successfully uploaded document: {doc_path}")
+        jobs.append((doc_path, upload_result))
     else:
         print(f"❌ Failed to upload document: {upload_result.get('error', 'Unknown error')}")
     
-    # Wait a moment for processing to complete
-    print("Waiting 10 seconds for processing to complete...")
-    time.sleep(10)
+    # Every job was queued before waiting on any, so the app's ingestion workers process them concurrently
+    for name, job in jobs:
+        if job.get("job_id"):
+            print(f"Waiting for {name} to be processed...")
+            status = wait_until_ready(job["job_id"])
+            print(f"{'✅' if status.get('status') == 'ready' else '❌'} {name}: {status.get('status')} {status.get('error') or ''}")
     
     # Test 4: Ask a question
     print("\n4. TESTING QUESTION ANSWERING")